@@ -0,0 +1,141 @@
+# agents/_batch.py
+
+"""
+Shared plumbing for the batched agents (*_agent_batch).
+
+Several calls are packed into one user message as <CALL id=i>...</CALL>
+blocks, and the model answers with one JSON object keyed by call id, e.g.
+{"summaries": [{"id": 0, "text": "..."}, ...]}. The system prompt is sent
+once per request instead of once per call, and N calls cost one request.
+
+Calls the model drops (or answers malformed) are left for the agent's own
+per-call fallback.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from graph.state import CallState
+from graph.tools import Tools
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph import json_utils
+
+
+#: At most this many calls share one request ...
+DEFAULT_BATCH_SIZE = 8
+#: ... and their rendered blocks stay under this many characters, which
+#: keeps a request well inside the model's context window.
+MAX_BATCH_CHARS = 60_000
+
+_Item = Tuple[int, str]  # (index into call_states, rendered call)
+
+
+def _chunks(
+    items: Sequence[_Item],
+    batch_size: int,
+    max_chars: int,
+) -> Iterator[List[_Item]]:
+    chunk: List[_Item] = []
+    size = 0
+    for item in items:
+        n = len(item[1])
+        if chunk and (len(chunk) >= batch_size or size + n > max_chars):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(item)
+        size += n
+    if chunk:
+        yield chunk
+
+
+def _call_blocks(chunk: List[_Item]) -> str:
+    return "\n\n".join(f"<CALL id={i}>\n{body}\n</CALL>" for i, body in chunk)
+
+
+def _parse_results(raw: str, result_key: str, value_key: str) -> Dict[int, Any]:
+    """
+    {call id: value} from the model's answer.
+
+    Raises:
+        ValueError if the answer is not JSON or an id is not an integer.
+    """
+    parsed = json_utils.loads_lenient(raw)
+    items = parsed.get(result_key) if isinstance(parsed, dict) else parsed
+    results: Dict[int, Any] = {}
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and value_key in item:
+            call_id = item.get("id")
+            if isinstance(call_id, (int, str)):
+                results[int(call_id)] = item[value_key]
+    return results
+
+
+def run_batched(
+    call_states: List[CallState],
+    tools: Optional[Tools],
+    *,
+    task: str,
+    system_prompt: str,
+    render: Callable[[CallState], str],
+    result_key: str,
+    value_key: str,
+    temperature: float,
+    include: Callable[[CallState], bool] = lambda cs: True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_chars: int = MAX_BATCH_CHARS,
+) -> Dict[int, Any]:
+    """
+    Ask the LLM about every call in `call_states` for which `include`
+    is true, `batch_size` calls per request. The model is chosen by
+    tools.choose_model(task, <request length>).
+
+    Returns {index into call_states: raw value from the model}; calls
+    missing from the result should use the agent's fallback (and count
+    towards their llm_fallbacks counter). Calls that `include` rejects
+    count towards their llm_skipped counter.
+    """
+    llm = tools.get_llm() if tools is not None else None
+    if llm is None:
+        return {}
+
+    items: List[_Item] = []
+    for i, cs in enumerate(call_states):
+        if include(cs):
+            items.append((i, render(cs)))
+        else:
+            cs.llm_skipped += 1
+    results: Dict[int, Any] = {}
+
+    for chunk in _chunks(items, batch_size, max_chars):
+        ids = [i for i, _ in chunk]
+        for i in ids:
+            call_states[i].tool_calls += 1
+        user_content = _call_blocks(chunk)
+        try:
+            completion = llm.chat.completions.create(
+                model=tools.choose_model(task, len(user_content)),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
+                ],
+                temperature=temperature,
+            )
+            raw = completion_text(completion)
+        except LLM_ERRORS:
+            continue
+        for i in ids:
+            call_states[i].tool_successes += 1
+
+        try:
+            chunk_results = _parse_results(raw, result_key, value_key)
+        except PARSE_ERRORS:
+            continue
+
+        # ignore ids the model invented
+        results.update((i, chunk_results[i]) for i in ids if i in chunk_results)
+
+    for i, _ in items:
+        if i not in results:
+            call_states[i].llm_fallbacks += 1
+
+    return results
@@ -0,0 +1,109 @@
+# agents/_keywords.py
+
+"""
+Single-pass keyword matching for the rule-based fallbacks.
+
+KeywordMatcher reports which keywords of each group occur in a text,
+with the same substring semantics as `kw in text`. When pyahocorasick is
+installed, all groups are matched by one Aho-Corasick automaton in a
+single pass over the text; otherwise each group is a precompiled regex
+alternation (longest keyword first, so that each match also accounts for
+the shorter keywords that are its prefixes).
+"""
+
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+import re
+
+try:
+    import ahocorasick
+except ImportError:  # optional dependency, fall back to `re`
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Match named groups of keywords against a (lowercased) text.
+    """
+
+    def __init__(self, groups: Dict[str, Sequence[str]]) -> None:
+        self.groups: Dict[str, List[str]] = {
+            name: list(keywords) for name, keywords in groups.items()
+        }
+
+        if ahocorasick is not None:
+            keyword_groups: Dict[str, List[str]] = {}
+            for name, keywords in self.groups.items():
+                for kw in keywords:
+                    keyword_groups.setdefault(kw, []).append(name)
+
+            self._automaton = ahocorasick.Automaton()
+            for kw, names in keyword_groups.items():
+                self._automaton.add_word(kw, (kw, tuple(names)))
+            self._automaton.make_automaton()
+        else:
+            # Zero-width lookahead so overlapping keywords are all reported.
+            # At each position the alternation reports only the longest
+            # keyword; every other keyword matching there is a prefix of it.
+            self._patterns = {}
+            self._prefixes: Dict[str, Dict[str, List[str]]] = {}
+            for name, keywords in self.groups.items():
+                unique = sorted(set(keywords), key=len, reverse=True)
+                if not unique:
+                    continue
+                self._patterns[name] = re.compile(
+                    "(?=(" + "|".join(map(re.escape, unique)) + "))"
+                )
+                self._prefixes[name] = {
+                    kw: [other for other in unique if kw.startswith(other)] for kw in unique
+                }
+
+    def found(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Distinct keywords of each group that occur in `text`.
+        """
+        result: Dict[str, Set[str]] = {name: set() for name in self.groups}
+        if not text:
+            return result
+
+        if ahocorasick is not None:
+            if len(self._automaton):
+                for _, (kw, names) in self._automaton.iter(text):
+                    for name in names:
+                        result[name].add(kw)
+        else:
+            for name, pattern in self._patterns.items():
+                prefixes = self._prefixes[name]
+                for kw in set(pattern.findall(text)):
+                    result[name].update(prefixes[kw])
+
+        return result
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[str, str, int]]:
+        """
+        Yield (group, keyword, start index) for every keyword occurrence.
+        """
+        if not text:
+            return
+
+        if ahocorasick is not None:
+            if len(self._automaton):
+                for end, (kw, names) in self._automaton.iter(text):
+                    for name in names:
+                        yield name, kw, end - len(kw) + 1
+        else:
+            for name, pattern in self._patterns.items():
+                prefixes = self._prefixes[name]
+                for m in pattern.finditer(text):
+                    for kw in prefixes[m.group(1)]:
+                        yield name, kw, m.start()
+
+    def first(self, text: str) -> Dict[str, Optional[str]]:
+        """
+        For each group, the first keyword in list order that occurs in `text`.
+        """
+        found = self.found(text)
+        return {
+            name: next((kw for kw in keywords if kw in found[name]), None)
+            for name, keywords in self.groups.items()
+        }
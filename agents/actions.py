@@ -4,6 +4,9 @@ from typing import List
 
 from graph.state import CallState
 from graph.tools import Tools
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph import json_utils
+from agents._batch import run_batched
 from typing import Optional
 
 
@@ -13,8 +16,7 @@ def _rule_based_actions(call_state: CallState) -> List[str]:
     """
     actions: List[str] = []
     sentiment = call_state.sentiment or "neutral"
-    pain_points = call_state.pain_points or []
-    text = (call_state.cleaned_transcript or call_state.raw_transcript or "").lower()
+    pain_points = call_state.pain_points
 
     for p in pain_points:
         pl = p.lower()
@@ -35,13 +37,8 @@ def _rule_based_actions(call_state: CallState) -> List[str]:
     if sentiment in ["very_negative", "negative"]:
         actions.append("Offer apology and consider goodwill credit or compensation.")
 
-    # Deduplicate actions
-    seen = set()
-    deduped = []
-    for a in actions:
-        if a not in seen:
-            seen.add(a)
-            deduped.append(a)
+    # Deduplicate actions (dicts preserve insertion order)
+    deduped = list(dict.fromkeys(actions))
 
     if not deduped:
         deduped = ["Follow standard support procedure and update CRM with call summary."]
@@ -49,21 +46,37 @@ def _rule_based_actions(call_state: CallState) -> List[str]:
     return deduped
 
 
+# Constant instructions are sent as the system message, so the prompt prefix
+# is identical for every call and only the call data varies.
+_SYSTEM_PROMPT = """
+You are an expert customer support coach. Based on the call information
+provided by the user, recommend concrete, practical next best actions for the
+agent or operations team.
+
+Guidelines:
+- Suggest 3–6 specific, actionable steps.
+- Focus on steps that resolve the customer's issue and prevent future repeat calls.
+- Include escalation only when necessary.
+- Keep each action as one clear sentence.
+
+Return a JSON array of strings, e.g.:
+[
+  "Expedite refund processing and send confirmation email to the customer.",
+  "Open a ticket with the mobile app team to investigate repeated login failures."
+]
+""".strip()
+
+
 def _build_actions_prompt(call_state: CallState) -> str:
     """
-    Prompt for LLM to propose targeted, practical actions.
+    Call-specific part of the prompt for proposing targeted, practical actions.
     """
     summary = call_state.summary
     sentiment = call_state.sentiment
-    pain_points = call_state.pain_points or []
-    entities = call_state.entities or {}
+    pain_points = call_state.pain_points
+    entities = call_state.entities
 
     return f"""
-You are an expert customer support coach.
-
-Based on the call information below, propose concrete next best actions
-for the agent or operations team.
-
 Summary:
 \"\"\"{summary}\"\"\"
 
@@ -74,18 +87,6 @@ Pain points:
 
 Entities/context:
 {entities}
-
-Guidelines:
-- Suggest 3–6 specific, actionable steps.
-- Focus on steps that resolve the customer's issue and prevent future repeat calls.
-- Include escalation only when necessary.
-- Keep each action as one clear sentence.
-
-Return a JSON array of strings, e.g.:
-[
-  "Expedite refund processing and send confirmation email to the customer.",
-  "Open a ticket with the mobile app team to investigate repeated login failures."
-]
 """.strip()
 
 
@@ -108,39 +109,92 @@ def actions_agent(
     actions: List[str] | None = None
     llm = tools.get_llm() if tools is not None else None
 
+    # Tiny transcripts: skip the LLM round-trip, use the rule-based path
+    if llm is not None and tools.is_trivial(
+        call_state.cleaned_transcript or call_state.raw_transcript or ""
+    ):
+        call_state.llm_skipped += 1
+        llm = None
+
     if llm is not None:
+        prompt = _build_actions_prompt(call_state)
+        call_state.tool_calls += 1
         try:
-            prompt = _build_actions_prompt(call_state)
-            call_state.tool_calls += 1
-
             completion = llm.chat.completions.create(
-                model="gpt-4o-mini",
+                model=tools.choose_model("actions"),
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You recommend concrete, practical customer support actions.",
-                    },
+                    {"role": "system", "content": _SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.4,
             )
-
-            content = completion.choices[0].message.content.strip()
+            content = completion_text(completion)
             call_state.tool_successes += 1
+        except LLM_ERRORS:
+            content = None
 
-            import json
-
-            parsed = json.loads(content)
-            if isinstance(parsed, list):
-                actions = [str(a).strip() for a in parsed if str(a).strip()]
-
-        except Exception:
-            actions = None
+        try:
+            parsed = json_utils.loads_lenient(content) if content is not None else None
+        except PARSE_ERRORS:
+            parsed = None
+        if isinstance(parsed, list):
+            actions = [str(a).strip() for a in parsed if str(a).strip()]
 
     if not actions:
+        if llm is not None:
+            call_state.llm_fallbacks += 1
         actions = _rule_based_actions(call_state)
 
     call_state.recommended_actions = actions
     call_state.step_count += 1
 
     return call_state
+
+
+# ---------------- batched variant ---------------- #
+
+_BATCH_SYSTEM_PROMPT = """
+You are an expert customer support coach recommending concrete, practical actions.
+
+The user provides several calls, each wrapped in <CALL id=N> ... </CALL>.
+For EACH call, propose next best actions for the agent or operations team:
+- Suggest 3–6 specific, actionable steps.
+- Focus on steps that resolve the customer's issue and prevent future repeat calls.
+- Include escalation only when necessary.
+- Keep each action as one clear sentence.
+
+Return ONLY a JSON object, one entry per call:
+{"actions": [{"id": N, "items": ["<action>", ...]}]}
+""".strip()
+
+
+def actions_agent_batch(
+    call_states: List[CallState],
+    tools: Optional[Tools] = None,
+) -> List[CallState]:
+    """
+    actions_agent for many calls, several calls per LLM request.
+    """
+    results = run_batched(
+        call_states,
+        tools,
+        task="actions",
+        system_prompt=_BATCH_SYSTEM_PROMPT,
+        render=_build_actions_prompt,
+        result_key="actions",
+        value_key="items",
+        temperature=0.4,
+        include=lambda cs: not tools.is_trivial(cs.cleaned_transcript or cs.raw_transcript or ""),
+    )
+
+    for i, call_state in enumerate(call_states):
+        items = results.get(i)
+        actions = (
+            [str(a).strip() for a in items if str(a).strip()]
+            if isinstance(items, list)
+            else []
+        )
+        call_state.recommended_actions = actions or _rule_based_actions(call_state)
+        call_state.step_count += 1
+
+    return call_states
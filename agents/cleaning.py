@@ -9,6 +9,11 @@ from typing import Optional
 from graph.tools import Tools
 
 
+_WS_RE = re.compile(r"\s+")
+_ARTIFACT_RE = re.compile(r"\[(noise|music|silence)\]", re.IGNORECASE)
+_UTTER_RE = re.compile(r"(?<=[.!?])\s+")
+
+
 def _fallback_clean(text: str) -> str:
     """
     Basic normalization fallback when MCP/custom cleaner is not available.
@@ -17,10 +22,10 @@ def _fallback_clean(text: str) -> str:
         return ""
 
     # Normalize whitespace
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
 
     # Remove obvious artifacts (optional)
-    text = re.sub(r"\[(noise|music|silence)\]", "", text, flags=re.IGNORECASE)
+    text = _ARTIFACT_RE.sub("", text)
 
     return text
 
@@ -33,10 +38,17 @@ def _split_utterances(text: str) -> List[str]:
     if not text:
         return []
 
-    parts = re.split(r"(?<=[.!?])\s+", text)
+    parts = _UTTER_RE.split(text)
     return [p.strip() for p in parts if p.strip()]
 
 
+def format_utterance_block(utterances: List[str]) -> str:
+    """
+    Numbered listing ("1. ...") of utterances, as sent to the LLM.
+    """
+    return "\n".join(f"{idx+1}. {utt}" for idx, utt in enumerate(utterances))
+
+
 def cleaning_agent(
     call_state: CallState,
     tools: Optional[Tools] = None,
@@ -75,5 +87,12 @@ def cleaning_agent(
     call_state.cleaned_transcript = cleaned
     call_state.utterances = _split_utterances(cleaned)
 
+    # 4. Lowercase once for all keyword-based fallbacks downstream
+    call_state.cleaned_transcript_lower = cleaned.lower()
+    call_state.utterances_lower = [u.lower() for u in call_state.utterances]
+
+    # 5. Numbered utterance listing, built once for the per-utterance prompts
+    call_state.utterance_block = format_utterance_block(call_state.utterances)
+
     call_state.step_count += 1
     return call_state
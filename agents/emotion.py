@@ -0,0 +1,157 @@
+# agents/emotion.py
+
+from typing import Any, Dict, List, Optional
+
+from graph.state import CallState
+from graph.tools import Tools
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph import json_utils
+from agents.cleaning import format_utterance_block
+from agents.sentiment import (
+    _normalize_label,
+    _send_sentiment_signal,
+    rule_based_sentiment,
+)
+from agents.frustration_loop import (
+    _FRUSTRATION_SET,
+    _item_level,
+    _rule_based_frustration_levels,
+    _send_frustration_summary,
+)
+
+
+# ---------------- prompt ---------------- #
+
+# Both tasks share one system message so the transcript is only sent once.
+_SYSTEM_PROMPT = """
+You analyze customer emotion in a support call. Output ONLY JSON.
+
+The user provides the customer's utterances in order, plus an optional call summary.
+
+Tasks:
+1. Classify the overall customer sentiment as one of:
+   very_negative, negative, neutral, positive, very_positive, mixed
+2. For each numbered utterance, label the customer's frustration level as one of:
+   low, medium, high
+
+Return a JSON object with this schema:
+{
+  "sentiment": "<label>",
+  "frustration": [{"index": 1, "level": "low"}]
+}
+""".strip()
+
+
+def _build_emotion_prompt(
+    utterances: List[str],
+    summary: str,
+    utterance_block: str = "",
+) -> str:
+    if not utterance_block:
+        utterance_block = format_utterance_block(utterances)
+
+    prompt = f"Customer utterances:\n\n{utterance_block}"
+    # In the concurrent stages this runs before summarization; an empty
+    # Summary block would only cost tokens.
+    if summary:
+        prompt += f'\n\nSummary:\n"""{summary}"""'
+    return prompt
+
+
+# ---------------- fused agent ---------------- #
+
+def emotion_agent(
+    call_state: CallState,
+    tools: Optional[Tools] = None,
+) -> CallState:
+    """
+    Fused Sentiment + Frustration Agent (one LLM call for both).
+
+    OUTPUT:
+        - call_state.sentiment
+        - call_state.frustration_timeline
+        - A2A sentiment_signal (→ actions) and frustration_summary (→ pain_points)
+    """
+    text = call_state.cleaned_transcript or call_state.raw_transcript or ""
+    utterances = call_state.utterances or ([text] if text.strip() else [])
+
+    call_state.emotion_done = True
+    if not utterances:
+        call_state.sentiment = "unknown"
+        call_state.frustration_timeline = []
+        call_state.step_count += 1
+        return call_state
+
+    llm = tools.get_llm() if tools else None
+    sentiment_label: str | None = None
+    llm_levels: Dict[int, str] = {}
+
+    # Tiny transcripts: both rule-based scanners are enough
+    if llm is not None and tools.is_trivial(text):
+        call_state.llm_skipped += 1
+        llm = None
+
+    # ---------------- LLM path ---------------- #
+    if llm is not None:
+        prompt = _build_emotion_prompt(
+            utterances, call_state.summary, call_state.utterance_block
+        )
+        call_state.tool_calls += 1
+        try:
+            completion = llm.chat.completions.create(
+                model=tools.choose_model("emotion"),
+                messages=[
+                    {"role": "system", "content": _SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.0,
+            )
+            raw = completion_text(completion)
+            call_state.tool_successes += 1
+        except LLM_ERRORS:
+            raw = None
+
+        try:
+            parsed = json_utils.loads_lenient(raw) if raw is not None else None
+        except PARSE_ERRORS:
+            parsed = None
+
+        if isinstance(parsed, dict):
+            sentiment_label = _normalize_label(str(parsed.get("sentiment") or ""))
+            items = parsed.get("frustration")
+            for item in items if isinstance(items, list) else []:
+                lvl = _item_level(item)
+                index = item.get("index") if isinstance(item, dict) else None
+                if lvl in _FRUSTRATION_SET and isinstance(index, int):
+                    llm_levels[index] = lvl
+
+    # ---------------- Fallbacks ---------------- #
+    if not sentiment_label:
+        if llm is not None:
+            call_state.llm_fallbacks += 1
+        sentiment_label = rule_based_sentiment(text, call_state.cleaned_transcript_lower or None)
+
+    # Utterance text always comes from our own segmentation; levels the
+    # model skipped or mislabeled are filled in by the rule-based scanner.
+    levels = _rule_based_frustration_levels(
+        utterances,
+        call_state.utterances_lower if call_state.utterances else None,
+    )
+    timeline: List[Dict[str, Any]] = [
+        {
+            "index": i + 1,
+            "utterance": utt,
+            "level": llm_levels.get(i + 1, level),
+        }
+        for i, (utt, level) in enumerate(zip(utterances, levels))
+    ]
+
+    call_state.sentiment = sentiment_label
+    call_state.frustration_timeline = timeline
+    call_state.step_count += 1
+
+    # ---------------- A2A Protocol messages ---------------- #
+    _send_sentiment_signal(call_state, sentiment_label, from_agent="emotion", tools=tools)
+    _send_frustration_summary(call_state, timeline, from_agent="emotion", tools=tools)
+
+    return call_state
@@ -1,12 +1,13 @@
 # agents/entities.py
 
-from typing import Dict, Any
-import json
+from typing import Dict, Any, List
 import re
 
 from graph.state import CallState
 from graph.tools import Tools
-from graph.a2a import send_message
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph.a2a import send_message, transport_for
+from graph import json_utils
 from typing import Dict, Any, Optional
 from typing import Optional
 from graph.tools import Tools
@@ -25,17 +26,41 @@ ISSUE_KEYWORDS = [
 ]
 
 
-def rule_based_entities(text: str) -> Dict[str, Any]:
-    text_lower = text.lower()
+def _alternation(keywords: List[str]) -> str:
+    return "|".join(map(re.escape, keywords))
 
-    product = next((kw for kw in PRODUCT_KEYWORDS if kw in text_lower), None)
-    issue = next((kw for kw in ISSUE_KEYWORDS if kw in text_lower), None)
 
+# Products, issues and priority cues in one pattern, so the transcript is
+# scanned once. The zero-width lookahead reports every position where a
+# cue starts (no keyword is a prefix of another, so none are shadowed).
+_ENT_RE = re.compile(
+    "(?=(?P<product>" + _alternation(PRODUCT_KEYWORDS) + ")"
+    "|(?P<issue>" + _alternation(ISSUE_KEYWORDS) + ")"
+    r"|(?P<priority>\b(?:cancel\b.*account|close my account)"
+    r"|supervisor|manager|third time|fourth time))"
+)
+
+
+def rule_based_entities(text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
+    if text_lower is None:
+        text_lower = text.lower()
+
+    products = set()
+    issues = set()
     priority = "normal"
-    if re.search(r"\b(cancel\b.*account|close my account)", text_lower):
-        priority = "high"
-    if re.search(r"supervisor|manager|third time|fourth time", text_lower):
-        priority = "high"
+
+    for m in _ENT_RE.finditer(text_lower):
+        kind = m.lastgroup
+        if kind == "product":
+            products.add(m.group(kind))
+        elif kind == "issue":
+            issues.add(m.group(kind))
+        else:
+            priority = "high"
+
+    # keyword lists are ordered by preference, not by position in the call
+    product = next((kw for kw in PRODUCT_KEYWORDS if kw in products), None)
+    issue = next((kw for kw in ISSUE_KEYWORDS if kw in issues), None)
 
     return {
         "customer_profile": None,
@@ -49,6 +74,21 @@ def rule_based_entities(text: str) -> Dict[str, Any]:
 
 # ------------------ Entity Agent (LLM + A2A) ------------------ #
 
+# Output schema, sent as the system message so only the transcript varies.
+_SYSTEM_PROMPT = """
+You extract structured context from customer support calls.
+
+Return a JSON object with keys:
+- customer_profile: brief description, if available
+- product: main product discussed
+- issue: main problem
+- context: important supplementary context
+- priority: one of ['low','normal','high']
+- other_tags: list of keywords
+
+Your entire answer MUST be valid JSON.
+""".strip()
+
 def entities_agent(
     call_state: CallState,
   tools: Optional[Tools] = None,
@@ -64,53 +104,51 @@ def entities_agent(
         - call_state.entities  (dict)
     """
     text = call_state.cleaned_transcript or call_state.raw_transcript
+    text_lower = call_state.cleaned_transcript_lower or None
     llm = tools.get_llm() if tools else None
 
+    # Tiny transcripts: skip the LLM round-trip, use the rule-based path
+    if llm is not None and tools.is_trivial(text):
+        call_state.llm_skipped += 1
+        llm = None
+
     entities: Dict[str, Any] = {}
 
     # Preferred path: LLM extraction
     if llm is not None:
-        try:
-            prompt = f"""
-You extract structured context from customer support calls.
-
+        prompt = f"""
 Transcript:
 \"\"\"{text}\"\"\"
-
-Return a JSON object with keys:
-- customer_profile: brief description, if available
-- product: main product discussed
-- issue: main problem
-- context: important supplementary context
-- priority: one of ['low','normal','high']
-- other_tags: list of keywords
-
-Your entire answer MUST be valid JSON.
 """.strip()
 
-            call_state.tool_calls += 1
-
+        call_state.tool_calls += 1
+        try:
             completion = llm.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
+                model=tools.choose_model("entities"),
+                messages=[
+                    {"role": "system", "content": _SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
                 temperature=0.0,
             )
-
-            raw = completion.choices[0].message.content.strip()
+            raw = completion_text(completion)
             call_state.tool_successes += 1
+        except LLM_ERRORS:
+            raw = None
 
-            try:
-                entities = json.loads(raw)
-            except Exception:
-                # LLM returned plain text — attempt heuristic fallback
-                entities = rule_based_entities(text)
-
-        except Exception:
-            entities = rule_based_entities(text)
+        try:
+            entities = json_utils.loads_lenient(raw) if raw is not None else None
+        except PARSE_ERRORS:
+            # LLM returned plain text — attempt heuristic fallback
+            entities = None
+        if not isinstance(entities, dict):
+            # no answer, or a JSON value that is not the requested object
+            call_state.llm_fallbacks += 1
+            entities = rule_based_entities(text, text_lower)
 
     else:
         # No LLM: fallback version
-        entities = rule_based_entities(text)
+        entities = rule_based_entities(text, text_lower)
 
     # ---------- Sanity check ----------
     if not isinstance(entities, dict):
@@ -132,6 +170,7 @@ Your entire answer MUST be valid JSON.
         to_agent="summarization",
         msg_type="entity_summary",
         payload=payload,
+        transport=transport_for(tools),
     )
 
     call_state.step_count += 1
@@ -1,18 +1,44 @@
 # agents/evaluation.py
 
 from typing import Dict, Any
-import json
 
 from graph.state import CallState
 from graph.tools import Tools
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph import json_utils
 from eval.metrics import compute_basic_eval
 from typing import Optional
 from graph.tools import Tools
 
 
+# Rubric and output schema, identical for every call (kept in the system
+# message so provider-side prompt caching can reuse the prefix).
+_SYSTEM_PROMPT = """
+You are a rigorous evaluator of an AI assistant's analysis of a customer
+support call. The user provides the original transcript and the assistant's
+internal analysis.
+
+Your task:
+1. Rate the following on a 0.0–1.0 scale (floats):
+   - faithfulness_score: Are the summary, pain points, and actions grounded in the transcript?
+   - coverage_score: Do they cover the main issues / concerns the customer raises?
+   - consistency_score: Are summary, sentiment, pain points, and actions mutually consistent?
+
+2. Provide a short textual note explaining any major issues.
+
+Return ONLY a valid JSON object with this schema:
+{
+  "faithfulness_score": 0.0,
+  "coverage_score": 0.0,
+  "consistency_score": 0.0,
+  "notes": "short explanation"
+}
+""".strip()
+
+
 def _build_eval_prompt(call_state: CallState) -> str:
     """
-    Build an instruction for the LLM to evaluate the pipeline output.
+    Build the call-specific input for the LLM evaluation of the pipeline output.
     The LLM should score:
       - faithfulness: how well outputs stick to the transcript
       - coverage: how well outputs cover the main issues in the call
@@ -21,17 +47,15 @@ def _build_eval_prompt(call_state: CallState) -> str:
     transcript = call_state.cleaned_transcript or call_state.raw_transcript
     summary = call_state.summary
     sentiment = call_state.sentiment
-    pain_points = call_state.pain_points or []
-    actions = call_state.recommended_actions or []
-    entities = call_state.entities or {}
+    pain_points = call_state.pain_points
+    actions = call_state.recommended_actions
+    entities = call_state.entities
 
     return f"""
-You are evaluating the quality of an AI assistant's analysis of a customer support call.
-
-Here is the original transcript:
+Original transcript:
 \"\"\"{transcript}\"\"\"
 
-Here is the assistant's internal analysis:
+Assistant's internal analysis:
 
 Summary:
 \"\"\"{summary}\"\"\"
@@ -39,29 +63,13 @@ Summary:
 Sentiment label: {sentiment}
 
 Entities:
-{json.dumps(entities, indent=2)}
+{json_utils.dumps_compact(entities)}
 
 Pain points:
-{json.dumps(pain_points, indent=2)}
+{json_utils.dumps_compact(pain_points)}
 
 Recommended actions:
-{json.dumps(actions, indent=2)}
-
-Your task:
-1. Rate the following on a 0.0–1.0 scale (floats):
-   - faithfulness_score: Are the summary, pain points, and actions grounded in the transcript?
-   - coverage_score: Do they cover the main issues / concerns the customer raises?
-   - consistency_score: Are summary, sentiment, pain points, and actions mutually consistent?
-
-2. Provide a short textual note explaining any major issues.
-
-Return ONLY a JSON object with this schema:
-{{
-  "faithfulness_score": 0.0,
-  "coverage_score": 0.0,
-  "consistency_score": 0.0,
-  "notes": "short explanation"
-}}
+{json_utils.dumps_compact(actions)}
 """.strip()
 
 
@@ -77,6 +85,31 @@ def _default_llm_scores() -> Dict[str, Any]:
     }
 
 
+_SCORE_KEYS = ("faithfulness_score", "coverage_score", "consistency_score")
+
+
+def _parse_scores(raw: str) -> Dict[str, Any]:
+    """
+    Validate the model's JSON answer; missing scores take the defaults.
+
+    Raises:
+        ValueError if the answer is not a JSON object or a score is not a number.
+    """
+    parsed = json_utils.loads_lenient(raw)
+    if not isinstance(parsed, dict):
+        raise ValueError("evaluation answer is not a JSON object")
+
+    scores = _default_llm_scores()
+    for key in _SCORE_KEYS:
+        if key in parsed:
+            value = parsed[key]
+            if not isinstance(value, (int, float, str)):
+                raise ValueError(f"{key} is not a number: {value!r}")
+            scores[key] = float(value)
+    scores["notes"] = str(parsed.get("notes") or "")
+    return {**parsed, **scores}
+
+
 def evaluation_agent(
     call_state: CallState,
     tools: Optional[Tools] = None,
@@ -96,41 +129,37 @@ def evaluation_agent(
     llm_scores: Dict[str, Any] = _default_llm_scores()
     llm = tools.get_llm() if tools is not None else None
 
+    # Tiny transcripts: the outputs are rule-based, nothing worth scoring
+    if llm is not None and tools.is_trivial(
+        call_state.cleaned_transcript or call_state.raw_transcript or ""
+    ):
+        call_state.llm_skipped += 1
+        llm = None
+
     if llm is not None:
+        prompt = _build_eval_prompt(call_state)
+        call_state.tool_calls += 1
         try:
-            prompt = _build_eval_prompt(call_state)
-            call_state.tool_calls += 1
-
             completion = llm.chat.completions.create(
-                model="gpt-4o-mini",
+                model=tools.choose_model("evaluation"),
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a rigorous evaluator. Output ONLY valid JSON.",
-                    },
+                    {"role": "system", "content": _SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.0,
             )
-
-            raw = completion.choices[0].message.content.strip()
+            raw = completion_text(completion)
             call_state.tool_successes += 1
-
-            parsed = json.loads(raw)
-
-            # Make sure required keys exist; fall back to defaults if missing
-            for key in ["faithfulness_score", "coverage_score", "consistency_score"]:
-                if key not in parsed:
-                    parsed[key] = llm_scores[key]
-
-            if "notes" not in parsed:
-                parsed["notes"] = ""
-
-            llm_scores = parsed
-
-        except Exception:
-            # If anything goes wrong, keep defaults
-            llm_scores = _default_llm_scores()
+        except LLM_ERRORS:
+            raw = None
+
+        if raw is not None:
+            try:
+                llm_scores = _parse_scores(raw)
+            except PARSE_ERRORS:
+                raw = None  # unusable answer: keep the defaults
+        if raw is None:
+            call_state.llm_fallbacks += 1
 
     # ---- 2. Basic observability metrics ----
     basic_eval = compute_basic_eval(call_state)
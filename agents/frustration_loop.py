@@ -1,78 +1,112 @@
 # agents/frustration_loop.py
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Set
 import re
-import json
 
 from graph.state import CallState
 from graph.tools import Tools
-from graph.a2a import send_message
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph.a2a import send_message, transport_for
+from graph import json_utils
+from agents._keywords import KeywordMatcher
+from agents._fastscan import batch_found
+from agents.cleaning import format_utterance_block
 from typing import Any, Dict, List, Optional
 from graph.tools import Tools
 
 
 FRUSTRATION_LABELS = ["low", "medium", "high"]
+_FRUSTRATION_SET = frozenset(FRUSTRATION_LABELS)
 
 
 # ---------------- rule-based fallback ---------------- #
 
+HIGH_TRIGGERS = [
+    "this is the third time",
+    "this is the second time",
+    "i am very frustrated",
+    "unacceptable",
+    "i want to cancel",
+    "close my account",
+    "worst experience",
+]
+
+MEDIUM_TRIGGERS = [
+    "not happy",
+    "disappointed",
+    "still not working",
+    "nobody helped me",
+    "already tried",
+    "taking too long",
+]
+
+_TRIGGERS = KeywordMatcher({"high": HIGH_TRIGGERS, "medium": MEDIUM_TRIGGERS})
+
+
 def _rule_based_frustration(utterance: str) -> str:
-    u = utterance.lower()
-
-    high_triggers = [
-        "this is the third time",
-        "this is the second time",
-        "i am very frustrated",
-        "unacceptable",
-        "i want to cancel",
-        "close my account",
-        "worst experience",
-    ]
-
-    medium_triggers = [
-        "not happy",
-        "disappointed",
-        "still not working",
-        "nobody helped me",
-        "already tried",
-        "taking too long",
-    ]
-
-    if any(t in u for t in high_triggers):
+    return _level_from_found(_TRIGGERS.found(utterance.lower()))
+
+
+def _rule_based_frustration_levels(
+    utterances: List[str],
+    utterances_lower: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Batch version of _rule_based_frustration: all utterances in one scan.
+    """
+    lowered = utterances_lower or [u.lower() for u in utterances]
+    return [_level_from_found(found) for found in batch_found(_TRIGGERS, lowered)]
+
+
+def _level_from_found(found: Dict[str, Set[str]]) -> str:
+    if found["high"]:
         return "high"
-    if any(t in u for t in medium_triggers):
+    if found["medium"]:
         return "medium"
     return "low"
 
 
 # ---------------- prompt builder ---------------- #
 
-def _build_frustration_prompt(utterances: List[str]) -> str:
-    utterance_block = "\n".join(
-        f"{idx+1}. {utt}" for idx, utt in enumerate(utterances)
-    )
-
-    return f"""
-You are analyzing a customer support call.
-
-Below are the customer's utterances in order:
-
-{utterance_block}
+# Labelling instructions, sent as the system message.
+_SYSTEM_PROMPT = """
+You classify customer frustration in a support call, utterance by utterance.
+The user provides the customer's utterances in order, numbered.
 
 For each line, label the customer's frustration level as one of:
 - low
 - medium
 - high
 
-Return a JSON array of objects with keys:
+Return ONLY a JSON array of objects with keys:
 - index: integer
 - utterance: text
 - level: one of ["low","medium","high"]
 """.strip()
 
 
+def _build_frustration_prompt(utterances: List[str], utterance_block: str = "") -> str:
+    # cleaning_agent precomputes the block; rebuild it only if it is missing
+    if not utterance_block:
+        utterance_block = format_utterance_block(utterances)
+
+    return f"""
+Customer utterances:
+
+{utterance_block}
+""".strip()
+
+
 # ---------------- helper: compute overall frustration ---------------- #
 
+def _item_level(item: Any) -> str:
+    """
+    Lowercased "level" of one model timeline item ("" if it has none).
+    """
+    level = item.get("level") if isinstance(item, dict) else None
+    return level.lower() if isinstance(level, str) else ""
+
+
 def _overall_level(timeline: List[Dict[str, Any]]) -> str:
     counts = {"low": 0, "medium": 0, "high": 0}
 
@@ -88,6 +122,33 @@ def _overall_level(timeline: List[Dict[str, Any]]) -> str:
     return "low"
 
 
+def _send_frustration_summary(
+    call_state: CallState,
+    timeline: List[Dict[str, Any]],
+    *,
+    from_agent: str,
+    tools: Optional[Tools] = None,
+) -> None:
+    """
+    A2A: tell the PainPoints agent how frustrated the customer was.
+    """
+    overall = _overall_level(timeline)
+    high_segments = [item for item in timeline if item["level"] == "high"]
+
+    send_message(
+        call_state,
+        from_agent=from_agent,
+        to_agent="pain_points",
+        msg_type="frustration_summary",
+        payload={
+            "overall_level": overall,
+            "high_segments": high_segments,
+            "timeline_length": len(timeline),
+        },
+        transport=transport_for(tools),
+    )
+
+
 # ---------------- main loop agent ---------------- #
 
 def frustration_loop_agent(
@@ -99,7 +160,17 @@ def frustration_loop_agent(
     - iterates over utterances
     - builds frustration timeline (LLM or fallback)
     - then sends A2A message to PainPoints agent
+
+    With tools.fused_mode, delegates to emotion_agent (sentiment and
+    frustration in one LLM call) unless that already ran for this call.
     """
+    if tools is not None and tools.fused_mode:
+        if call_state.emotion_done:
+            return call_state
+        # imported here: agents.emotion builds on this module
+        from agents.emotion import emotion_agent
+        return emotion_agent(call_state, tools=tools)
+
     utterances = call_state.utterances
 
     # If no segmentation happened yet, fallback to entire transcript
@@ -114,56 +185,65 @@ def frustration_loop_agent(
     llm = tools.get_llm() if tools else None
     timeline: List[Dict[str, Any]] = []
 
+    # Tiny transcripts: the trigger-phrase scanner is enough
+    if llm is not None and tools.is_trivial(" ".join(utterances)):
+        call_state.llm_skipped += 1
+        llm = None
+
     # ---------------- LLM path ---------------- #
     if llm is not None:
+        prompt = _build_frustration_prompt(utterances, call_state.utterance_block)
+        call_state.tool_calls += 1
         try:
-            prompt = _build_frustration_prompt(utterances)
-            call_state.tool_calls += 1
-
             completion = llm.chat.completions.create(
-                model="gpt-4o-mini",
+                model=tools.choose_model("frustration"),
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "Classify frustration level per utterance. Output ONLY JSON."
-                    },
+                    {"role": "system", "content": _SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.0,
             )
-
-            raw = completion.choices[0].message.content.strip()
+            raw = completion_text(completion)
             call_state.tool_successes += 1
+        except LLM_ERRORS:
+            raw = None
 
-            parsed = json.loads(raw)
-
-            if isinstance(parsed, list):
-                # sanitize
-                timeline = []
-                for item in parsed:
-                    lvl = (item.get("level") or "").lower()
-                    if lvl not in FRUSTRATION_LABELS:
-                        lvl = _rule_based_frustration(item.get("utterance", ""))
-                    timeline.append(
-                        {
-                            "index": int(item.get("index", 0)),
-                            "utterance": item.get("utterance", ""),
-                            "level": lvl,
-                        }
-                    )
-
-        except Exception:
-            timeline = []
+        try:
+            parsed = json_utils.loads_lenient(raw) if raw is not None else None
+        except PARSE_ERRORS:
+            parsed = None
+
+        if isinstance(parsed, list):
+            # sanitize: keep only the model's level; utterance text and
+            # index come from what we sent (echoed text may be truncated)
+            timeline = [
+                {
+                    "index": i + 1,
+                    "utterance": utterances[i],
+                    "level": (
+                        lvl
+                        if (lvl := _item_level(item)) in _FRUSTRATION_SET
+                        else _rule_based_frustration(utterances[i])
+                    ),
+                }
+                for i, item in enumerate(parsed[: len(utterances)])
+            ]
 
     # ---------------- Fallback path ---------------- #
     if not timeline:
+        if llm is not None:
+            call_state.llm_fallbacks += 1
+        levels = _rule_based_frustration_levels(
+            utterances,
+            call_state.utterances_lower if call_state.utterances else None,
+        )
         timeline = [
             {
                 "index": i + 1,
                 "utterance": utt,
-                "level": _rule_based_frustration(utt),
+                "level": level,
             }
-            for i, utt in enumerate(utterances)
+            for i, (utt, level) in enumerate(zip(utterances, levels))
         ]
 
     # Save to state
@@ -171,19 +251,6 @@ def frustration_loop_agent(
     call_state.step_count += 1
 
     # ---------------- A2A Protocol message ---------------- #
-    overall = _overall_level(timeline)
-    high_segments = [item for item in timeline if item["level"] == "high"]
-
-    send_message(
-        call_state,
-        from_agent="frustration_loop",
-        to_agent="pain_points",
-        msg_type="frustration_summary",
-        payload={
-            "overall_level": overall,
-            "high_segments": high_segments,
-            "timeline_length": len(timeline),
-        },
-    )
+    _send_frustration_summary(call_state, timeline, from_agent="frustration_loop", tools=tools)
 
     return call_state
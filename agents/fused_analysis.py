@@ -0,0 +1,155 @@
+# agents/fused_analysis.py
+
+from typing import Any, Dict, List, Optional
+
+from graph.state import CallState
+from graph.tools import Tools
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph import json_utils
+from agents.summarization import _rule_based_summary
+from agents.sentiment import (
+    _normalize_label,
+    _send_sentiment_signal,
+    rule_based_sentiment,
+)
+from agents.pain_points import _rule_based_pain_points
+
+
+# ---------------- prompt ---------------- #
+
+# Summary, sentiment and pain points read the same context, so one request
+# carries the transcript once instead of three times.
+_SYSTEM_PROMPT = """
+You analyze customer support calls for an operations team. Output ONLY JSON.
+
+The user provides the call transcript plus context extracted by other agents.
+
+Tasks:
+1. summary: a concise, NEUTRAL internal CRM note of 4–6 sentences. Mention the
+   customer’s main issue and key context (prior attempts, deadlines, escalation),
+   the product or service if clear, and the outcome (resolved vs unresolved) if
+   it can be inferred. Paraphrase; plain text, no bullet points, no markdown.
+2. sentiment: the overall customer sentiment, one of:
+   very_negative, negative, neutral, positive, very_positive, mixed
+3. pain_points: 2–5 distinct customer pain points, each a short phrase
+   (5–12 words), without repeating the same idea in different words.
+
+Return a JSON object with this schema:
+{
+  "summary": "<summary>",
+  "sentiment": "<label>",
+  "pain_points": ["<pain point>"]
+}
+""".strip()
+
+
+def _build_fused_prompt(call_state: CallState) -> str:
+    transcript = call_state.cleaned_transcript or call_state.raw_transcript or ""
+
+    return f"""
+Transcript:
+\"\"\"{transcript}\"\"\"
+
+Entities/context:
+{json_utils.dumps_compact(call_state.entities)}
+
+Entity summary from another agent:
+{json_utils.dumps_compact(call_state.entity_summary)}
+
+Frustration summary from another agent:
+{json_utils.dumps_compact(call_state.frustration_summary)}
+""".strip()
+
+
+# ---------------- fused agent ---------------- #
+
+def fused_analysis_agent(
+    call_state: CallState,
+    tools: Optional[Tools] = None,
+) -> CallState:
+    """
+    Fused Summarization + Sentiment + Pain Point Agent (one LLM call for all three).
+
+    INPUT:
+        - cleaned transcript, entities
+        - A2A entity_summary and frustration_summary
+
+    OUTPUT:
+        - call_state.summary
+        - call_state.sentiment
+        - call_state.pain_points
+        - A2A sentiment_signal (→ actions)
+
+    Each field the model leaves out (or gets wrong) falls back to the
+    owning agent's rule-based path.
+    """
+    text = call_state.cleaned_transcript or call_state.raw_transcript or ""
+    llm = tools.get_llm() if tools is not None else None
+    parsed: Dict[str, Any] = {}
+
+    # Tiny transcripts: the three rule-based paths are enough
+    if llm is not None and tools.is_trivial(text):
+        call_state.llm_skipped += 1
+        llm = None
+
+    # ---------------- LLM path ---------------- #
+    if llm is not None:
+        prompt = _build_fused_prompt(call_state)
+        call_state.tool_calls += 1
+        try:
+            completion = llm.chat.completions.create(
+                model=tools.choose_model("fused_analysis"),
+                messages=[
+                    {"role": "system", "content": _SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.3,
+                response_format={"type": "json_object"},
+            )
+
+            raw = completion_text(completion)
+            call_state.tool_successes += 1
+        except LLM_ERRORS:
+            raw = None
+
+        try:
+            result = json_utils.loads_lenient(raw) if raw is not None else None
+        except PARSE_ERRORS:
+            result = None
+        if isinstance(result, dict):
+            parsed = result
+
+    # ---------------- per-field fallbacks ---------------- #
+    summary = parsed.get("summary")
+    summary_text = summary.strip() if isinstance(summary, str) else ""
+    sentiment_label = _normalize_label(str(parsed.get("sentiment") or ""))
+    items = parsed.get("pain_points")
+    pain_points: List[str] = (
+        [str(p).strip() for p in items if str(p).strip()]
+        if isinstance(items, list)
+        else []
+    )
+    complete = summary_text and sentiment_label != "unknown" and pain_points
+    if llm is not None and not complete:
+        call_state.llm_fallbacks += 1
+
+    call_state.summary = summary_text or (
+        _rule_based_summary(call_state)
+        if text.strip()
+        else "No transcript content was available to summarize."
+    )
+
+    if sentiment_label == "unknown" and text.strip():
+        sentiment_label = rule_based_sentiment(text, call_state.cleaned_transcript_lower or None)
+    call_state.sentiment = sentiment_label
+
+    call_state.pain_points = pain_points or _rule_based_pain_points(
+        call_state, call_state.frustration_summary
+    )
+
+    call_state.step_count += 1
+
+    # ---------------- A2A Protocol messages ---------------- #
+    _send_sentiment_signal(call_state, sentiment_label, from_agent="fused_analysis", tools=tools)
+
+    return call_state
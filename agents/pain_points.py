@@ -1,22 +1,39 @@
 # agents/pain_points.py
 
 from typing import List, Dict, Any
-import json
 
 from graph.state import CallState
 from graph.tools import Tools
-from graph.a2a import get_messages_for_agent
+from graph.retry import LLM_ERRORS, PARSE_ERRORS, completion_text
+from graph import json_utils
+from agents._keywords import KeywordMatcher
+from agents._batch import run_batched
 from typing import List, Dict, Any, Optional
 from graph.tools import Tools
 
 
-def _rule_based_pain_points(call_state: CallState) -> List[str]:
+_PAIN_KEYWORDS = KeywordMatcher(
+    {
+        "refund": ["refund", "chargeback"],
+        "login": ["login", "password"],
+        "fee": ["fee", "overcharged"],
+    }
+)
+
+
+def _rule_based_pain_points(
+    call_state: CallState,
+    frustration_summary: Dict[str, Any],
+) -> List[str]:
     """
     Heuristic-based pain point extractor (fallback).
-    Uses entities, transcript text, and A2A frustration summary.
+    Uses entities, transcript text, and the A2A frustration summary
+    (already fetched by the agent).
     """
-    entities = call_state.entities or {}
-    text = (call_state.cleaned_transcript or call_state.raw_transcript or "").lower()
+    entities = call_state.entities
+    text = call_state.cleaned_transcript_lower or (
+        call_state.cleaned_transcript or call_state.raw_transcript or ""
+    ).lower()
     pain_points: List[str] = []
 
     issue = entities.get("issue")
@@ -28,32 +45,21 @@ def _rule_based_pain_points(call_state: CallState) -> List[str]:
         else:
             pain_points.append(issue)
 
-    # Use text patterns
-    if "refund" in text or "chargeback" in text:
+    # Use text patterns (single scan for all keyword groups)
+    found = _PAIN_KEYWORDS.found(text)
+    if found["refund"]:
         pain_points.append("refund or chargeback delay")
-    if "login" in text or "password" in text:
+    if found["login"]:
         pain_points.append("login or authentication issues")
-    if "fee" in text or "overcharged" in text:
+    if found["fee"]:
         pain_points.append("unexpected fees or overcharging")
 
     # 🔹 Use A2A frustration summary
-    msgs = get_messages_for_agent(
-        call_state,
-        agent_name="pain_points",
-        msg_type="frustration_summary",
-    )
-    if msgs:
-        summary = msgs[-1].get("payload", {})  # take latest
-        if summary.get("overall_level") == "high":
-            pain_points.append("customer is highly frustrated after multiple attempts")
+    if frustration_summary.get("overall_level") == "high":
+        pain_points.append("customer is highly frustrated after multiple attempts")
 
     # dedupe while preserving order
-    seen = set()
-    deduped: List[str] = []
-    for p in pain_points:
-        if p not in seen:
-            seen.add(p)
-            deduped.append(p)
+    deduped: List[str] = list(dict.fromkeys(pain_points))
 
     if not deduped:
         deduped = ["unclear primary pain point"]
@@ -61,18 +67,30 @@ def _rule_based_pain_points(call_state: CallState) -> List[str]:
     return deduped
 
 
+# Fixed task description; the per-call context goes in the user message.
+_SYSTEM_PROMPT = """
+You extract customer pain points from support calls, using the call
+information provided by the user.
+
+Task:
+- Identify 2–5 distinct customer pain points.
+- Each pain point should be a short phrase (5–12 words).
+- Keep them non-overlapping: do not repeat the same idea with different wording.
+
+Return a JSON array of strings.
+""".strip()
+
+
 def _build_pain_point_prompt(
     call_state: CallState,
     frustration_summary: Dict[str, Any],
 ) -> str:
     transcript = call_state.cleaned_transcript or call_state.raw_transcript or ""
-    summary = call_state.summary or ""
-    entities = call_state.entities or {}
-    frustration_summary_json = json.dumps(frustration_summary, indent=2)
+    summary = call_state.summary
+    entities = call_state.entities
+    frustration_summary_json = json_utils.dumps_compact(frustration_summary)
 
     return f"""
-You are an assistant that extracts customer pain points from support calls.
-
 Transcript:
 \"\"\"{transcript}\"\"\"
 
@@ -80,17 +98,10 @@ Internal summary:
 \"\"\"{summary}\"\"\"
 
 Entities/context:
-{json.dumps(entities, indent=2)}
+{json_utils.dumps_compact(entities)}
 
 Frustration summary from another agent:
 {frustration_summary_json}
-
-Task:
-- Identify 2–5 distinct customer pain points.
-- Each pain point should be a short phrase (5–12 words).
-- Do not repeat the same idea with different wording.
-
-Return a JSON array of strings.
 """.strip()
 
 
@@ -111,44 +122,97 @@ def pain_points_agent(
     llm = tools.get_llm() if tools is not None else None
     pain_points: List[str] | None = None
 
-    # get A2A frustration summary (if any)
-    msgs = get_messages_for_agent(
-        call_state,
-        agent_name="pain_points",
-        msg_type="frustration_summary",
-    )
-    frustration_summary: Dict[str, Any] = msgs[-1].get("payload", {}) if msgs else {}
+    # Tiny transcripts: skip the LLM round-trip, use the rule-based path
+    if llm is not None and tools.is_trivial(
+        call_state.cleaned_transcript or call_state.raw_transcript or ""
+    ):
+        call_state.llm_skipped += 1
+        llm = None
+
+    # A2A frustration summary (empty if frustration_loop has not run)
+    frustration_summary: Dict[str, Any] = call_state.frustration_summary
 
     if llm is not None:
+        prompt = _build_pain_point_prompt(call_state, frustration_summary)
+        call_state.tool_calls += 1
         try:
-            prompt = _build_pain_point_prompt(call_state, frustration_summary)
-            call_state.tool_calls += 1
-
             completion = llm.chat.completions.create(
-                model="gpt-4o-mini",
+                model=tools.choose_model("pain_points"),
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You extract concise, non-overlapping customer pain points.",
-                    },
+                    {"role": "system", "content": _SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.3,
             )
-            content = completion.choices[0].message.content.strip()
+            content = completion_text(completion)
             call_state.tool_successes += 1
+        except LLM_ERRORS:
+            content = None
 
-            parsed = json.loads(content)
-            if isinstance(parsed, list):
-                pain_points = [str(p).strip() for p in parsed if str(p).strip()]
-        except Exception:
-            pain_points = None
+        try:
+            parsed = json_utils.loads_lenient(content) if content is not None else None
+        except PARSE_ERRORS:
+            parsed = None
+        if isinstance(parsed, list):
+            pain_points = [str(p).strip() for p in parsed if str(p).strip()]
 
     # Fallback to rule-based if LLM is unavailable or fails
     if not pain_points:
-        pain_points = _rule_based_pain_points(call_state)
+        if llm is not None:
+            call_state.llm_fallbacks += 1
+        pain_points = _rule_based_pain_points(call_state, frustration_summary)
 
     call_state.pain_points = pain_points
     call_state.step_count += 1
 
     return call_state
+
+
+# ---------------- batched variant ---------------- #
+
+_BATCH_SYSTEM_PROMPT = """
+You extract concise, non-overlapping customer pain points from support calls.
+
+The user provides several calls, each wrapped in <CALL id=N> ... </CALL>.
+For EACH call:
+- Identify 2–5 distinct customer pain points.
+- Each pain point should be a short phrase (5–12 words).
+- Do not repeat the same idea with different wording.
+
+Return ONLY a JSON object, one entry per call:
+{"pain_points": [{"id": N, "items": ["<pain point>", ...]}]}
+""".strip()
+
+
+def pain_points_agent_batch(
+    call_states: List[CallState],
+    tools: Optional[Tools] = None,
+) -> List[CallState]:
+    """
+    pain_points_agent for many calls, several calls per LLM request.
+    """
+    results = run_batched(
+        call_states,
+        tools,
+        task="pain_points",
+        system_prompt=_BATCH_SYSTEM_PROMPT,
+        render=lambda cs: _build_pain_point_prompt(cs, cs.frustration_summary),
+        result_key="pain_points",
+        value_key="items",
+        temperature=0.3,
+        include=lambda cs: not tools.is_trivial(cs.cleaned_transcript or cs.raw_transcript or ""),
+    )
+
+    for i, call_state in enumerate(call_states):
+        items = results.get(i)
+        pain_points = (
+            [str(p).strip() for p in items if str(p).strip()]
+            if isinstance(items, list)
+            else []
+        )
+        call_state.pain_points = pain_points or _rule_based_pain_points(
+            call_state, call_state.frustration_summary
+        )
+        call_state.step_count += 1
+
+    return call_states
@@ -0,0 +1,115 @@
+# agents/pipeline.py
+
+"""
+Concurrent execution of the CallSense agents.
+
+Each stage in AGENT_STAGES is dispatched with asyncio.gather. The agents'
+hot path is a blocking LLM request, so every agent runs in a worker thread
+(asyncio.to_thread); the OpenAI client is thread-safe and releases the GIL
+while waiting on the network, so a stage costs roughly one round-trip
+instead of one per agent.
+
+Agents in the same stage work on their own copy of the CallState. After
+the stage, the copies are merged back:
+- fields an agent changed are copied over
+- counters (step_count, tool_calls, ..., llm_fallbacks) are summed
+- new A2A messages are appended (and indexed) in stage order
+"""
+
+from __future__ import annotations
+from collections import defaultdict
+from dataclasses import fields
+from typing import Any, Dict, List, Optional
+import asyncio
+import copy
+
+from graph.state import CallState
+from graph.a2a import index_message
+from graph.tools import Tools
+from graph.agents import AGENT_STAGES, get_agent
+
+
+_COUNTER_FIELDS = (
+    "step_count", "tool_calls", "tool_successes", "llm_skipped", "llm_fallbacks"
+)
+
+
+def _branch(call_state: CallState) -> CallState:
+    """
+    Copy of the state that an agent can mutate without racing its siblings.
+    """
+    branch = copy.copy(call_state)
+    for f in fields(branch):
+        value = getattr(branch, f.name)
+        if isinstance(value, (list, dict)):
+            setattr(branch, f.name, copy.copy(value))
+    # the index's lists are shared by the shallow copy above
+    branch.messages_index = defaultdict(
+        list, {key: list(positions) for key, positions in call_state.messages_index.items()}
+    )
+    return branch
+
+
+def _merge(call_state: CallState, branches: List[CallState]) -> CallState:
+    """
+    Fold the per-agent copies of a stage back into `call_state`.
+    """
+    n_messages = len(call_state.messages)
+    updates: Dict[str, Any] = {}
+    deltas: Dict[str, int] = {name: 0 for name in _COUNTER_FIELDS}
+    new_messages: List[Dict[str, Any]] = []
+
+    for branch in branches:
+        for f in fields(branch):
+            if f.name in ("messages", "messages_index"):
+                continue
+            value = getattr(branch, f.name)
+            if f.name in deltas:
+                deltas[f.name] += value - getattr(call_state, f.name)
+            elif value != getattr(call_state, f.name):
+                updates[f.name] = value
+        new_messages.extend(branch.messages[n_messages:])
+
+    for name, value in updates.items():
+        setattr(call_state, name, value)
+    for name, delta in deltas.items():
+        setattr(call_state, name, getattr(call_state, name) + delta)
+    call_state.messages.extend(new_messages)
+    for position in range(n_messages, len(call_state.messages)):
+        index_message(call_state, position)
+
+    return call_state
+
+
+async def _run_stage(
+    call_state: CallState,
+    agent_names: List[str],
+    tools: Optional[Tools],
+) -> CallState:
+    if len(agent_names) == 1:
+        agent_fn = get_agent(agent_names[0])
+        return await asyncio.to_thread(agent_fn, call_state, tools=tools)
+
+    branches = await asyncio.gather(
+        *(
+            asyncio.to_thread(get_agent(name), _branch(call_state), tools=tools)
+            for name in agent_names
+        )
+    )
+    return _merge(call_state, list(branches))
+
+
+async def run_stages_async(
+    call_state: CallState,
+    tools: Optional[Tools] = None,
+) -> CallState:
+    """
+    Run all agents in AGENT_STAGES, stage by stage, with the agents
+    inside a stage running concurrently.
+
+    Produces the same CallState as running AGENT_EXECUTION_ORDER
+    sequentially (evaluation is left to the caller).
+    """
+    for stage in AGENT_STAGES:
+        call_state = await _run_stage(call_state, stage, tools)
+    return call_state
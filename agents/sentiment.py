@@ -1,12 +1,16 @@
 # agents/sentiment.py
 
-from typing import Any
+from typing import Any, List
 import re
 import json
 
 from graph.state import CallState
 from graph.tools import Tools
-from graph.a2a import send_message
+from graph.retry import LLM_ERRORS
+from graph.a2a import send_message, transport_for
+from agents._keywords import KeywordMatcher
+from agents._fastscan import batch_found
+from agents._batch import run_batched
 from typing import Any, Optional
 from graph.tools import Tools
 
@@ -36,19 +40,41 @@ POSITIVE_HINTS = [
 ]
 
 
-def rule_based_sentiment(text: str) -> str:
+_HINTS = KeywordMatcher({"negative": NEGATIVE_HINTS, "positive": POSITIVE_HINTS})
+_WS_RE = re.compile(r"\s+")
+_NON_LABEL_RE = re.compile(r"[^a-z_]")
+
+
+def rule_based_sentiment(text: str, text_lower: Optional[str] = None) -> str:
     """
     Extremely lightweight heuristic sentiment classifier.
     This is only a safety net if the LLM/tool is unavailable.
+
+    `text_lower` may be passed when a lowercased copy already exists.
     """
     if not text:
         return "unknown"
 
-    t = text.lower()
+    t = text_lower if text_lower is not None else text.lower()
 
-    neg_hits = sum(1 for w in NEGATIVE_HINTS if w in t)
-    pos_hits = sum(1 for w in POSITIVE_HINTS if w in t)
+    # count distinct hints present, in a single scan of the text
+    found = _HINTS.found(t)
+    return _label_from_hits(len(found["negative"]), len(found["positive"]))
 
+
+def rule_based_sentiments(texts: List[str]) -> List[str]:
+    """
+    Batch version of rule_based_sentiment (e.g. for offline eval runs):
+    all texts are scanned in one pass.
+    """
+    lowered = [(t or "").lower() for t in texts]
+    return [
+        _label_from_hits(len(found["negative"]), len(found["positive"])) if t else "unknown"
+        for t, found in zip(lowered, batch_found(_HINTS, lowered))
+    ]
+
+
+def _label_from_hits(neg_hits: int, pos_hits: int) -> str:
     if neg_hits > pos_hits and neg_hits >= 2:
         return "very_negative"
     if neg_hits > pos_hits and neg_hits >= 1:
@@ -65,28 +91,33 @@ def rule_based_sentiment(text: str) -> str:
 
 # ---------- prompt builder for LLM ---------- #
 
+# Label set and instructions; the user message only carries the call.
+_SYSTEM_PROMPT = """
+You are a precise sentiment classifier for customer support calls. The user
+provides the call transcript and an internal summary.
+
+Classify the overall customer sentiment as one of:
+- very_negative
+- negative
+- neutral
+- positive
+- very_positive
+- mixed
+
+Return ONLY the label, with no other text.
+""".strip()
+
+
 def _build_sentiment_prompt(call_state: CallState) -> str:
     transcript = call_state.cleaned_transcript or call_state.raw_transcript or ""
-    summary = call_state.summary or ""
+    summary = call_state.summary
 
     return f"""
-You classify the overall customer sentiment for a support call.
-
 Transcript:
 \"\"\"{transcript}\"\"\"
 
 Summary:
 \"\"\"{summary}\"\"\"
-
-Valid labels:
-- very_negative
-- negative
-- neutral
-- positive
-- very_positive
-- mixed
-
-Return ONLY the label.
 """.strip()
 
 
@@ -97,12 +128,59 @@ def _normalize_label(label: str) -> str:
     if not label:
         return "unknown"
 
-    first = re.split(r"\s+", label.strip())[0].lower()
-    first = re.sub(r"[^a-z_]", "", first)
+    first = _WS_RE.split(label.strip())[0].lower()
+    first = _NON_LABEL_RE.sub("", first)
 
     return first if first in ALLOWED_LABELS else "unknown"
 
 
+def _read_streamed_label(stream: Any) -> str:
+    """
+    Read a streamed completion only until the first word is complete.
+
+    The label is a single word, but it may arrive split over several chunks
+    ("very", "_neg", "ative"), so we stop at the first whitespace after some
+    content, or at the end of the stream.
+    """
+    parts: List[str] = []
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content
+            if not piece:
+                continue
+            parts.append(piece)
+            label = "".join(parts).lstrip()
+            if label and label != label.rstrip():
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    return "".join(parts)
+
+
+def _send_sentiment_signal(
+    call_state: CallState,
+    sentiment_label: str,
+    *,
+    from_agent: str,
+    tools: Optional[Tools] = None,
+) -> None:
+    """
+    A2A: downstream, actions_agent may want to know the sentiment.
+    """
+    send_message(
+        call_state,
+        from_agent=from_agent,
+        to_agent="actions",
+        msg_type="sentiment_signal",
+        payload={"sentiment": sentiment_label},
+        transport=transport_for(tools),
+    )
+
+
 # ---------- main sentiment agent ---------- #
 
 def sentiment_agent(
@@ -115,7 +193,17 @@ def sentiment_agent(
     OUTPUT:
         - call_state.sentiment (string)
         - A2A message sent to actions agent
+
+    With tools.fused_mode, delegates to emotion_agent (sentiment and
+    frustration in one LLM call) unless that already ran for this call.
     """
+    if tools is not None and tools.fused_mode:
+        if call_state.emotion_done:
+            return call_state
+        # imported here: agents.emotion builds on this module
+        from agents.emotion import emotion_agent
+        return emotion_agent(call_state, tools=tools)
+
     text = call_state.cleaned_transcript or call_state.raw_transcript or ""
     if not text.strip():
         call_state.sentiment = "unknown"
@@ -125,47 +213,93 @@ def sentiment_agent(
     llm = tools.get_llm() if tools else None
     sentiment_label: str | None = None
 
+    # Tiny transcripts: skip the LLM round-trip, use the rule-based path
+    if llm is not None and tools.is_trivial(text):
+        call_state.llm_skipped += 1
+        llm = None
+
     # ---------- LLM Path ----------
     if llm is not None:
+        prompt = _build_sentiment_prompt(call_state)
+        call_state.tool_calls += 1
         try:
-            prompt = _build_sentiment_prompt(call_state)
-            call_state.tool_calls += 1
-
             completion = llm.chat.completions.create(
-                model="gpt-4o-mini",
+                model=tools.choose_model("sentiment"),
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a precise sentiment classifier. Return only the label."
-                    },
+                    {"role": "system", "content": _SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.0,
+                max_tokens=5,
+                stream=True,
             )
 
-            raw_label = completion.choices[0].message.content.strip()
+            raw_label = _read_streamed_label(completion).strip()
             call_state.tool_successes += 1
-
             sentiment_label = _normalize_label(raw_label)
-
-        except Exception:
+        except LLM_ERRORS:
             sentiment_label = None
 
     # ---------- Fallback ----------
     if not sentiment_label:
-        sentiment_label = rule_based_sentiment(text)
+        if llm is not None:
+            call_state.llm_fallbacks += 1
+        sentiment_label = rule_based_sentiment(text, call_state.cleaned_transcript_lower or None)
 
     call_state.sentiment = sentiment_label
     call_state.step_count += 1
 
     # ---------- A2A Protocol ----------
-    # downstream: actions_agent may want to know sentiment
-    send_message(
-        call_state,
-        from_agent="sentiment",
-        to_agent="actions",
-        msg_type="sentiment_signal",
-        payload={"sentiment": sentiment_label},
-    )
+    _send_sentiment_signal(call_state, sentiment_label, from_agent="sentiment", tools=tools)
 
     return call_state
+
+
+# ---------- batched variant ---------- #
+
+_BATCH_SYSTEM_PROMPT = """
+You are a precise sentiment classifier for customer support calls.
+
+The user provides several calls, each wrapped in <CALL id=N> ... </CALL>.
+Classify the overall customer sentiment of EACH call as one of:
+very_negative, negative, neutral, positive, very_positive, mixed
+
+Return ONLY a JSON object, one entry per call:
+{"sentiments": [{"id": N, "label": "<label>"}]}
+""".strip()
+
+
+def sentiment_agent_batch(
+    call_states: List[CallState],
+    tools: Optional[Tools] = None,
+) -> List[CallState]:
+    """
+    sentiment_agent for many calls, several calls per LLM request.
+    Calls the model skipped are classified by the rule-based scanner,
+    all in one pass.
+    """
+    results = run_batched(
+        call_states,
+        tools,
+        task="sentiment",
+        system_prompt=_BATCH_SYSTEM_PROMPT,
+        render=_build_sentiment_prompt,
+        result_key="sentiments",
+        value_key="label",
+        temperature=0.0,
+        include=lambda cs: not tools.is_trivial(cs.cleaned_transcript or cs.raw_transcript or ""),
+    )
+
+    labels = {i: _normalize_label(str(raw)) for i, raw in results.items() if raw}
+    missing = [i for i in range(len(call_states)) if i not in labels]
+    fallback = rule_based_sentiments(
+        [call_states[i].cleaned_transcript or call_states[i].raw_transcript or "" for i in missing]
+    )
+    labels.update(zip(missing, fallback))
+
+    for i, call_state in enumerate(call_states):
+        call_state.sentiment = labels[i]
+        call_state.step_count += 1
+        _send_sentiment_signal(call_state, labels[i], from_agent="sentiment", tools=tools)
+
+    return call_states
@@ -1,42 +1,35 @@
 # agents/summarization.py
 
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+from string import Template
 from textwrap import shorten
-import json
+import os
 
 from graph.state import CallState
 from graph.tools import Tools
-from graph.a2a import get_messages_for_agent
+from graph.retry import LLM_ERRORS, completion_text
+from graph import json_utils
+from graph.tokens import split_tokens, truncate_tokens
+from agents._batch import run_batched
 from typing import Any, Dict, Optional
 from graph.tools import Tools
 
 
+#: Below this many characters the rule-based summary (the call itself,
+#: truncated) is as good as an LLM one.
+SUMMARIZE_MIN_CHARS = 200
 
-def _build_summary_prompt(
-    call_state: CallState,
-    entity_summary: Dict[str, Any],
-) -> str:
-    """
-    Build a rich prompt for the LLM using:
-    - cleaned transcript
-    - extracted entities
-    - compact A2A entity summary (from entities agent)
-    """
-    transcript = call_state.cleaned_transcript or call_state.raw_transcript or ""
-    entities = call_state.entities or {}
-
-    return f"""
-You are an assistant that summarizes customer support calls for an operations team.
-
-Transcript:
-\"\"\"{transcript}\"\"\"
+#: Transcript token budget per summarization request. Longer calls are
+#: summarized part by part, then the part summaries are combined.
+SUMMARIZE_MAX_CTX_TOKENS = int(os.getenv("SUMMARIZE_MAX_CTX_TOKENS", "6000"))
+#: Parts are summarized this many at a time, and part summaries are combined
+#: this many per request; longer calls take extra combine rounds, so no part
+#: of the call is dropped.
+SUMMARIZE_MAX_PARTS = max(2, int(os.getenv("SUMMARIZE_MAX_PARTS", "4")))
 
-Extracted entities and context (if any):
-{json.dumps(entities, indent=2)}
-
-Entity summary from another agent:
-{json.dumps(entity_summary, indent=2)}
 
+_REQUIREMENTS = """
 Write a concise, NEUTRAL summary of this call for an internal CRM note.
 
 Requirements:
@@ -49,6 +42,114 @@ Requirements:
 Return plain text, no bullet points, no markdown.
 """.strip()
 
+# Per-call context, shared by the single-call prompt and the batch entries.
+_CONTEXT_TEXT = """
+Transcript:
+\"\"\"$transcript\"\"\"
+
+Extracted entities and context (if any):
+$entities
+
+Entity summary from another agent:
+$entity_summary
+""".strip()
+
+_PROMPT_HEADER = (
+    "You are an assistant that summarizes customer support calls "
+    "for an operations team.\n\n"
+)
+
+
+def _split_template(text: str, *names: str) -> Tuple[str, ...]:
+    """
+    Split `text` at each $name placeholder (in order) into the constant
+    fragments around them.
+    """
+    fragments: List[str] = []
+    rest = text
+    for name in names:
+        head, sep, rest = rest.partition("$" + name)
+        if not sep:
+            raise ValueError(f"placeholder ${name} missing from template")
+        fragments.append(head)
+    fragments.append(rest)
+    return tuple(fragments)
+
+
+# Split once at import; a prompt is then a single "".join of the constant
+# fragments and the three call-specific values.
+_CTX_PRE, _CTX_MID1, _CTX_MID2, _CTX_POST = _split_template(
+    _CONTEXT_TEXT, "transcript", "entities", "entity_summary"
+)
+_PROMPT_PRE = _PROMPT_HEADER + _CTX_PRE
+_PROMPT_POST = _CTX_POST + "\n\n" + _REQUIREMENTS
+
+# map step for long calls: one request per transcript part
+_PART_TMPL = Template("""
+Below is part $part of $parts of a long customer support call transcript.
+
+Transcript part:
+\"\"\"$transcript\"\"\"
+
+Summarize what happens in this part in 2–4 neutral sentences: the customer's
+issue, relevant context, and anything resolved or left open.
+Return plain text, no bullet points, no markdown.
+""".strip())
+
+# intermediate reduce for very long calls: consecutive part summaries → one
+_COMBINE_TMPL = Template("""
+Below are summaries of consecutive parts ($first to $last of $parts) of a long
+customer support call, in order.
+
+Part summaries:
+$partials
+
+Combine them into one summary of 3–5 neutral sentences covering the customer's
+issue, relevant context, and anything resolved or left open, in order.
+Return plain text, no bullet points, no markdown.
+""".strip())
+
+# reduce step: the part summaries stand in for the transcript
+_REDUCE_TMPL = Template("""
+You are an assistant that summarizes customer support calls for an operations team.
+The call was too long to read at once; below are summaries of its parts, in order.
+
+Part summaries:
+$partials
+
+Extracted entities and context (if any):
+$entities
+
+Entity summary from another agent:
+$entity_summary
+
+""".lstrip() + _REQUIREMENTS)
+
+_SYSTEM_PROMPT = "You are a careful, concise call summarization assistant."
+
+
+def _build_summary_prompt(
+    call_state: CallState,
+    entity_summary: Dict[str, Any],
+) -> str:
+    """
+    Build a rich prompt for the LLM using:
+    - cleaned transcript
+    - extracted entities
+    - compact A2A entity summary (from entities agent)
+    """
+    transcript = call_state.cleaned_transcript or call_state.raw_transcript or ""
+
+    return "".join((
+        _PROMPT_PRE,
+        truncate_tokens(transcript, SUMMARIZE_MAX_CTX_TOKENS),
+        _CTX_MID1,
+        json_utils.dumps_compact(call_state.entities),
+        _CTX_MID2,
+        json_utils.dumps_compact(entity_summary),
+        _PROMPT_POST,
+    ))
+
 
 def _rule_based_summary(call_state: CallState, max_chars: int = 500) -> str:
     """
@@ -67,6 +168,110 @@ def _rule_based_summary(call_state: CallState, max_chars: int = 500) -> str:
     return shorten(text, width=max_chars, placeholder="...")
 
 
+def _consume_stream(stream: Any, on_token: Callable[[str], None]) -> str:
+    """
+    Forward each streamed text delta to `on_token`; return the full text.
+    """
+    parts: List[str] = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        piece = chunk.choices[0].delta.content
+        if piece:
+            on_token(piece)
+            parts.append(piece)
+    return "".join(parts)
+
+
+def _complete(
+    llm: Any,
+    tools: Tools,
+    prompt: str,
+    char_len: int,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    One summarization request; streamed to `on_token` if given.
+    """
+    completion = llm.chat.completions.create(
+        model=tools.choose_model("summarize", char_len),
+        messages=[
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+        stream=on_token is not None,
+    )
+
+    if on_token is None:
+        return completion_text(completion)
+    return _consume_stream(completion, on_token).strip()
+
+
+def _format_partials(partials: List[Tuple[int, int, str]]) -> str:
+    return "\n\n".join(
+        f"Part {first}: {text}" if first == last else f"Parts {first}–{last}: {text}"
+        for first, last, text in partials
+    )
+
+
+def _map_reduce_summary(
+    llm: Any,
+    tools: Tools,
+    call_state: CallState,
+    parts: List[str],
+    entity_summary: Dict[str, Any],
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Summarize each transcript part concurrently, then summarize the
+    part summaries. While there are more than SUMMARIZE_MAX_PARTS
+    summaries, consecutive groups of them are combined first. Only the
+    final request is streamed.
+    """
+    def summarize_part(i: int) -> str:
+        prompt = _PART_TMPL.substitute(part=i + 1, parts=len(parts), transcript=parts[i])
+        return _complete(llm, tools, prompt, len(parts[i]))
+
+    def combine(group: List[Tuple[int, int, str]]) -> Tuple[int, int, str]:
+        if len(group) == 1:
+            return group[0]
+        first, last = group[0][0], group[-1][1]
+        prompt = _COMBINE_TMPL.substitute(
+            first=first, last=last, parts=len(parts), partials=_format_partials(group)
+        )
+        return first, last, _complete(llm, tools, prompt, len(prompt))
+
+    # (first part, last part, summary); counters are only touched from this thread
+    call_state.tool_calls += len(parts)
+    with ThreadPoolExecutor(max_workers=min(len(parts), SUMMARIZE_MAX_PARTS)) as pool:
+        partials = [
+            (i + 1, i + 1, text)
+            for i, text in enumerate(pool.map(summarize_part, range(len(parts))))
+        ]
+        call_state.tool_successes += len(parts)
+
+        while len(partials) > SUMMARIZE_MAX_PARTS:
+            groups = [
+                partials[i:i + SUMMARIZE_MAX_PARTS]
+                for i in range(0, len(partials), SUMMARIZE_MAX_PARTS)
+            ]
+            n_requests = sum(len(group) > 1 for group in groups)
+            call_state.tool_calls += n_requests
+            partials = list(pool.map(combine, groups))
+            call_state.tool_successes += n_requests
+
+    prompt = _REDUCE_TMPL.substitute(
+        partials=_format_partials(partials),
+        entities=json_utils.dumps_compact(call_state.entities),
+        entity_summary=json_utils.dumps_compact(entity_summary),
+    )
+    call_state.tool_calls += 1
+    summary_text = _complete(llm, tools, prompt, sum(map(len, parts)), on_token)
+    call_state.tool_successes += 1
+    return summary_text
+
+
 def summarization_agent(
     call_state: CallState,
     tools: Optional[Tools] = None,
@@ -82,6 +287,12 @@ def summarization_agent(
 
     OUTPUT:
         - call_state.summary: a concise textual summary of the call
+
+    If tools.on_summary_token is set, the completion is streamed and each
+    text delta is passed to it as it arrives (e.g. for a live UI).
+
+    Transcripts over SUMMARIZE_MAX_CTX_TOKENS are summarized map-reduce
+    style: each part on its own, then one summary of the part summaries.
     """
     # If we literally have no text, bail early
     if not (call_state.cleaned_transcript or call_state.raw_transcript):
@@ -90,44 +301,112 @@ def summarization_agent(
         return call_state
 
     llm = tools.get_llm() if tools is not None else None
+    on_token = tools.on_summary_token if tools is not None else None
     summary_text: str | None = None
 
-    # Get A2A entity summary, if any
-    msgs = get_messages_for_agent(
-        call_state,
-        agent_name="summarization",
-        msg_type="entity_summary",
-    )
-    entity_summary: Dict[str, Any] = msgs[-1].get("payload", {}) if msgs else {}
+    # Short calls: skip the LLM round-trip, use the rule-based summary
+    if llm is not None and tools.is_trivial(
+        call_state.cleaned_transcript or call_state.raw_transcript,
+        min_chars=SUMMARIZE_MIN_CHARS,
+    ):
+        call_state.llm_skipped += 1
+        llm = None
+
+    # A2A entity summary from entities_agent (empty if it has not run)
+    entity_summary: Dict[str, Any] = call_state.entity_summary
 
     if llm is not None:
         try:
-            prompt = _build_summary_prompt(call_state, entity_summary)
-            call_state.tool_calls += 1
-
-            completion = llm.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a careful, concise call summarization assistant.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,
-            )
-
-            summary_text = completion.choices[0].message.content.strip()
-            call_state.tool_successes += 1
-
-        except Exception:
+            transcript = call_state.cleaned_transcript or call_state.raw_transcript
+            parts = split_tokens(transcript, SUMMARIZE_MAX_CTX_TOKENS)
+
+            if len(parts) > 1:
+                summary_text = _map_reduce_summary(
+                    llm, tools, call_state, parts, entity_summary, on_token
+                )
+            else:
+                prompt = _build_summary_prompt(call_state, entity_summary)
+                call_state.tool_calls += 1
+                summary_text = _complete(llm, tools, prompt, len(transcript), on_token)
+                call_state.tool_successes += 1
+
+        except LLM_ERRORS:
             summary_text = None
 
     # Fallback if no llm or the call failed
     if not summary_text:
+        if llm is not None:
+            call_state.llm_fallbacks += 1
         summary_text = _rule_based_summary(call_state)
 
     call_state.summary = summary_text
     call_state.step_count += 1
 
     return call_state
+
+
+# ---------------- batched variant ---------------- #
+
+_BATCH_SYSTEM_PROMPT = """
+You are a careful, concise call summarization assistant for an operations team.
+
+The user provides several customer support calls, each wrapped in
+<CALL id=N> ... </CALL>. Summarize EACH call separately as a concise,
+NEUTRAL internal CRM note:
+- 4–6 sentences
+- Mention the customer’s main issue and key context (prior attempts, deadlines, escalation, etc.)
+- Mention the product or service if clear
+- Capture the outcome (resolved vs unresolved) if it can be inferred
+- Paraphrase; plain text, no bullet points, no markdown
+
+Return ONLY a JSON object, one entry per call:
+{"summaries": [{"id": N, "text": "<summary>"}]}
+""".strip()
+
+
+def _build_batch_entry(call_state: CallState) -> str:
+    transcript = truncate_tokens(
+        call_state.cleaned_transcript or call_state.raw_transcript or "",
+        SUMMARIZE_MAX_CTX_TOKENS,
+    )
+    return "".join((
+        _CTX_PRE,
+        transcript,
+        _CTX_MID1,
+        json_utils.dumps_compact(call_state.entities),
+        _CTX_MID2,
+        json_utils.dumps_compact(call_state.entity_summary),
+        _CTX_POST,
+    ))
+
+
+def summarization_agent_batch(
+    call_states: List[CallState],
+    tools: Optional[Tools] = None,
+) -> List[CallState]:
+    """
+    summarization_agent for many calls, several calls per LLM request.
+    Calls the model skipped get the rule-based summary.
+    """
+    results = run_batched(
+        call_states,
+        tools,
+        task="summarize",
+        system_prompt=_BATCH_SYSTEM_PROMPT,
+        render=_build_batch_entry,
+        result_key="summaries",
+        value_key="text",
+        temperature=0.3,
+        include=lambda cs: not tools.is_trivial(
+            cs.cleaned_transcript or cs.raw_transcript or "",
+            min_chars=SUMMARIZE_MIN_CHARS,
+        ),
+    )
+
+    for i, call_state in enumerate(call_states):
+        text = results.get(i)
+        summary_text = text.strip() if isinstance(text, str) else ""
+        call_state.summary = summary_text or _rule_based_summary(call_state)
+        call_state.step_count += 1
+
+    return call_states
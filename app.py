@@ -4,14 +4,28 @@ import os
 load_dotenv()  # <-- MUST be FIRST THING before reading API key
 
 
+import asyncio
 import os
 import pathlib
+import queue
+import threading
 
+import httpx
 import streamlit as st
 import pandas as pd
 from openai import OpenAI
 
-from graph.supervisor import run_pipeline, GLOBAL_MEMORY
+from graph.supervisor import (
+    run_pipeline_async,
+    run_pipeline_batch_async,
+    flush_memory_updates,
+    load_memory,
+    memory_snapshot,
+)
+from graph.llm_cache import SemanticCache, DEFAULT_CACHE_PATH
+from graph.result_cache import ResultCache, DEFAULT_RESULT_CACHE_DIR
+from graph.throttle import ThrottledLLM
+from graph.state import MemoryState
 from typing import Optional
 
 # ------------- Setup ------------- #
@@ -25,44 +39,141 @@ if OPENAI_API_KEY is None:
         "OPENAI_API_KEY not found. Please add it to your .env or environment."
     )
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+
+def _build_http_client() -> httpx.Client:
+    """
+    Pooled keep-alive HTTP client, sized above ThrottledLLM's concurrency
+    so concurrent agents never wait for a socket.
+    """
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    try:
+        return httpx.Client(limits=limits, http2=True, timeout=60.0)
+    except ImportError:
+        # HTTP/2 needs the optional `h2` package (httpx[http2])
+        return httpx.Client(limits=limits, timeout=60.0)
+
+
+@st.cache_resource
+def get_llm_client(api_key: str) -> ThrottledLLM:
+    """
+    One OpenAI client (connection pool + rate limiter) per API key, shared
+    across Streamlit reruns and sessions. A rotated key gets a fresh client.
+    """
+    # retries are handled by the pipeline (graph/retry.py), not inside the SDK
+    openai_client = OpenAI(
+        api_key=api_key,
+        max_retries=0,
+        http_client=_build_http_client(),
+    )
+    return ThrottledLLM(openai_client)
+
+
+client = get_llm_client(OPENAI_API_KEY)
+
+
+@st.cache_resource
+def get_memory() -> MemoryState:
+    """
+    Trends saved by earlier runs, loaded once per process instead of
+    being re-aggregated.
+    """
+    return load_memory()
+
+
+get_memory()
+
+
+@st.cache_resource
+def get_llm_cache() -> SemanticCache:
+    """
+    One SQLite-backed prompt cache shared across Streamlit reruns.
+    """
+    return SemanticCache(DEFAULT_CACHE_PATH)
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """
+    Full-pipeline results keyed by transcript, so re-analyzing a call is instant.
+    """
+    return ResultCache(DEFAULT_RESULT_CACHE_DIR)
 
 
 # ------------- Data loading helpers ------------- #
 
-@st.cache_data
-def load_calls_csv() -> Optional[pd.DataFrame]:
+APP_DIR = pathlib.Path(__file__).resolve().parent
+
+#: Candidate call tables, without extension and relative to this file; for
+#: each, a .parquet file (see tools/convert_csv_to_parquet.py) is preferred
+#: over the .csv.
+CALL_TABLE_STEMS = [
+    "data/callsense_calls",
+    "data/calls",
+    "data/calls_master",
+    "data/call_recordings",  # sample table shipped with the repo
+]
+
+
+def _read_calls_csv(path: pathlib.Path) -> pd.DataFrame:
+    try:
+        # multithreaded parser, Arrow-backed string columns
+        return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    except (ImportError, TypeError, ValueError):
+        # pyarrow not installed, or a pandas version without dtype_backend
+        return pd.read_csv(path)
+
+
+# cache_resource returns the same DataFrame without hashing/copying it on
+# every rerun; the app only reads from it.
+@st.cache_resource
+def load_calls_table() -> Optional[pd.DataFrame]:
     """
-    Try to load a CSV of calls from the data/ folder.
+    Try to load a table of calls from the data/ folder.
 
-    You can adjust the path or filename if needed.
+    You can adjust the paths in CALL_TABLE_STEMS if needed.
     """
-    possible_paths = [
-        "data/callsense_calls.csv",
-        "data/calls.csv",
-        "data/calls_master.csv",
-    ]
-    for p in possible_paths:
-        if pathlib.Path(p).exists():
-            df = pd.read_csv(p)
-            return df
+    for stem in CALL_TABLE_STEMS:
+        base = APP_DIR / stem
+        parquet_path = base.with_suffix(".parquet")
+        if parquet_path.exists():
+            df = pd.read_parquet(parquet_path, engine="pyarrow", memory_map=True)
+            return add_transcript_column(df)
+        csv_path = base.with_suffix(".csv")
+        if csv_path.exists():
+            return add_transcript_column(_read_calls_csv(csv_path))
     return None
 
 
-def get_transcript_from_row(row: pd.Series) -> str:
+#: Column holding each row's transcript text, added by load_calls_table.
+TRANSCRIPT_COLUMN = "__transcript__"
+
+TRANSCRIPT_COLUMN_NAMES = ["transcript", "text", "call_text", "utterance"]
+
+
+def add_transcript_column(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Try to extract transcript text from a row.
+    Pick the transcript column once per table and copy it to
+    TRANSCRIPT_COLUMN as strings, so a row's transcript is a single lookup.
 
-    Adjust the column names here based on your actual CSV.
+    Adjust TRANSCRIPT_COLUMN_NAMES based on your actual CSV (matched
+    case-insensitively); otherwise the first text column is used.
     """
-    for col in ["transcript", "text", "call_text", "utterance"]:
-        if col in row and isinstance(row[col], str):
-            return row[col]
-    # fallback: first string-like column
-    for val in row.values:
-        if isinstance(val, str):
-            return val
-    return ""
+    by_lower = {str(c).lower(): c for c in df.columns}
+    col = next((by_lower[n] for n in TRANSCRIPT_COLUMN_NAMES if n in by_lower), None)
+    if col is None:
+        col = next(
+            (
+                c for c in df.columns
+                if pd.api.types.is_string_dtype(df[c]) or pd.api.types.is_object_dtype(df[c])
+            ),
+            None,
+        )
+
+    if col is None:
+        df[TRANSCRIPT_COLUMN] = ""
+    else:
+        df[TRANSCRIPT_COLUMN] = df[col].astype("string").fillna("")
+    return df
 
 
 # ------------- Streamlit UI ------------- #
@@ -84,7 +195,7 @@ Agents in the pipeline:
 """
 )
 
-df = load_calls_csv()
+df = load_calls_table()
 
 with st.sidebar:
     st.header("Call Input")
@@ -101,18 +212,17 @@ with st.sidebar:
         if df is None:
             st.warning(
                 "No CSV found in data/. "
-                "Place a file like `data/callsense_calls.csv` and restart the app."
+                "Place a file like `data/callsense_calls.csv` (or `.parquet`) and restart the app."
             )
         else:
             st.success(f"Loaded {len(df)} calls from CSV.")
             st.write("Sample of loaded data:")
-            st.dataframe(df.head())
+            st.dataframe(df.drop(columns=TRANSCRIPT_COLUMN).head())
 
             row_idx = st.number_input(
                 "Select row index", min_value=0, max_value=len(df) - 1, value=0
             )
-            row = df.iloc[int(row_idx)]
-            selected_transcript = get_transcript_from_row(row)
+            selected_transcript = df[TRANSCRIPT_COLUMN].iloc[int(row_idx)]
     else:
         selected_transcript = st.text_area(
             "Paste a call transcript here",
@@ -122,22 +232,46 @@ with st.sidebar:
 
     run_button = st.button("🔍 Analyze Call")
 
+    batch_button = False
+    if input_mode == "Select from CSV" and df is not None:
+        batch_button = st.button(f"📦 Analyze all {len(df)} calls (batched)")
+
 # ----------- Main pipeline run ----------- #
 
 if run_button:
     if not selected_transcript.strip():
         st.error("Please provide a transcript (via CSV or text area) before running.")
     else:
-        with st.spinner("Running multi-agent pipeline..."):
-            call_state = run_pipeline(
-                raw_transcript=selected_transcript,
-                llm_client=client,
-                cleaner=None,
-                data_loader=None,
-                update_memory=True,
-            )
-
-        st.success("Analysis complete ✅")
+        # The pipeline runs in a background thread and streams summary tokens
+        # through a queue, so the summary renders while later agents still run.
+        summary_tokens: "queue.Queue[Optional[str]]" = queue.Queue()
+        outcome: dict = {}
+        # st.cache_resource needs the script thread, so resolve these here
+        llm_cache, result_cache = get_llm_cache(), get_result_cache()
+
+        def _run_in_background() -> None:
+            try:
+                outcome["call_state"] = asyncio.run(
+                    run_pipeline_async(
+                        raw_transcript=selected_transcript,
+                        llm_client=client,
+                        cleaner=None,
+                        data_loader=None,
+                        update_memory=True,
+                        llm_cache=llm_cache,
+                        result_cache=result_cache,
+                        on_summary_token=summary_tokens.put,
+                    )
+                )
+            except BaseException as exc:
+                outcome["error"] = exc
+            finally:
+                summary_tokens.put(None)  # end of stream
+
+        worker = threading.Thread(target=_run_in_background, daemon=True)
+        worker.start()
+
+        status = st.empty()
 
         # Layout: left = transcript + summary, right = insights
         col_left, col_right = st.columns(2)
@@ -147,14 +281,31 @@ if run_button:
             st.write(selected_transcript)
 
             st.subheader("📝 Summary")
-            st.write(call_state.summary or "_No summary generated._")
+            summary_box = st.empty()
+            with st.spinner("Running multi-agent pipeline..."):
+                with summary_box.container():
+                    streamed_summary = st.write_stream(iter(summary_tokens.get, None))
+                worker.join()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        call_state = outcome["call_state"]
+
+        with col_left:
+            # Replace the streamed text unless it is the final summary: nothing
+            # streamed (cached result), or the stream broke off and the agent
+            # fell back to the rule-based summary.
+            if str(streamed_summary or "").strip() != (call_state.summary or "").strip():
+                summary_box.write(call_state.summary or "_No summary generated._")
 
             st.subheader("🙂 Sentiment")
             st.write(call_state.sentiment or "_Unknown_")
 
+        status.success("Analysis complete ✅")
+
         with col_right:
             st.subheader("🧩 Extracted Entities / Context")
-            st.json(call_state.entities or {})
+            st.json(call_state.entities)
 
             st.subheader("📉 Frustration Timeline")
             if call_state.frustration_timeline:
@@ -181,7 +332,7 @@ if run_button:
         st.subheader("📊 Evaluation & Observability")
 
         st.write("**Per-call evaluation (call_state.evaluation):**")
-        st.json(call_state.evaluation or {})
+        st.json(call_state.evaluation)
 
         st.write("**Basic runtime stats:**")
         st.write(
@@ -189,21 +340,48 @@ if run_button:
                 "step_count": call_state.step_count,
                 "tool_calls": call_state.tool_calls,
                 "tool_successes": call_state.tool_successes,
+                "llm_skipped": call_state.llm_skipped,
             }
         )
 
-        # Show memory snapshot
+        # Show memory snapshot (the call's results are already on screen,
+        # so waiting for its queued memory update here costs nothing visible)
         st.markdown("### 🧠 Memory Snapshot (Global Trends)")
+        flush_memory_updates()
+        memory = memory_snapshot()
         st.write(
             {
-                "total_calls": GLOBAL_MEMORY.total_calls,
-                "sentiment_counts": GLOBAL_MEMORY.sentiment_counts,
-                "top_pain_points": GLOBAL_MEMORY.pain_point_counts,
-                "product_issue_counts": GLOBAL_MEMORY.product_issue_counts,
-                "avg_faithfulness": GLOBAL_MEMORY.avg_faithfulness,
-                "avg_coverage": GLOBAL_MEMORY.avg_coverage,
-                "avg_consistency": GLOBAL_MEMORY.avg_consistency,
+                "total_calls": memory.total_calls,
+                "sentiment_counts": memory.sentiment_counts,
+                "top_pain_points": dict(memory.pain_point_counts.most_common(10)),
+                "product_issue_counts": memory.product_issue_counts,
+                "avg_faithfulness": memory.avg_faithfulness,
+                "avg_coverage": memory.avg_coverage,
+                "avg_consistency": memory.avg_consistency,
             }
         )
+elif batch_button:
+    transcripts = df[TRANSCRIPT_COLUMN].tolist()
+    with st.spinner(f"Running batched pipeline on {len(transcripts)} calls..."):
+        call_states = asyncio.run(
+            run_pipeline_batch_async(
+                transcripts,
+                llm_client=client,
+                update_memory=True,
+                llm_cache=get_llm_cache(),
+            )
+        )
+
+    st.success(f"Analyzed {len(call_states)} calls ✅")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "summary": [cs.summary for cs in call_states],
+                "sentiment": [cs.sentiment for cs in call_states],
+                "pain_points": ["; ".join(cs.pain_points) for cs in call_states],
+                "recommended_actions": ["; ".join(cs.recommended_actions) for cs in call_states],
+            }
+        )
+    )
 else:
     st.info("Select or paste a transcript, then click **Analyze Call** to run the pipeline.")
@@ -64,20 +64,19 @@ def update_memory_from_call(memory: MemoryState, call_state: CallState) -> Memor
 
     # --- sentiment distribution ---
     sentiment = call_state.sentiment or "unknown"
-    memory.sentiment_counts[sentiment] = memory.sentiment_counts.get(sentiment, 0) + 1
+    memory.sentiment_counts[sentiment] += 1
 
     # --- pain point frequencies ---
-    for p in call_state.pain_points or []:
-        memory.pain_point_counts[p] = memory.pain_point_counts.get(p, 0) + 1
+    memory.pain_point_counts.update(call_state.pain_points)
 
     # --- product-level issue counts (if entities contains "product") ---
-    entities = call_state.entities or {}
+    entities = call_state.entities
     product = entities.get("product")
     if product:
-        memory.product_issue_counts[product] = memory.product_issue_counts.get(product, 0) + 1
+        memory.product_issue_counts[product] += 1
 
     # --- running averages for eval scores, if present ---
-    eval_data = call_state.evaluation or {}
+    eval_data = call_state.evaluation
 
     # helper: incremental running average
     def _update_running_avg(current_avg: float, new_value: float, count: int) -> float:
@@ -9,14 +9,40 @@ Each message has:
     - to: name of the receiving agent (or "any")
     - type: message type string, e.g. "frustration_summary"
     - payload: arbitrary JSON-serializable dict
+
+Within one process the envelope is unnecessary: message types that have a
+typed field on CallState (entity_summary, frustration_summary,
+sentiment_signal) are written straight to that field, and the envelope is
+only appended for the "envelope" transport (tools.distributed=True).
+
+Envelopes are also indexed by (to, type) and (to, "*") in
+CallState.messages_index (as positions in CallState.messages), so lookups
+do not scan the whole log and still return messages in the order sent.
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Any, Dict, List
+import heapq
 
 from graph.state import CallState
 
 
+INPROC = "inproc"
+ENVELOPE = "envelope"
+
+#: Message types delivered straight to the CallState field of the same name.
+#: Any other type goes through the envelope log, even if its name happens
+#: to match some other CallState attribute.
+TYPED_FIELDS = frozenset({"entity_summary", "frustration_summary", "sentiment_signal"})
+
+
+def transport_for(tools: Any) -> str:
+    """
+    A2A transport to use with the given Tools bundle (None → in-process).
+    """
+    return ENVELOPE if getattr(tools, "distributed", False) else INPROC
+
+
 def send_message(
     state: CallState,
     *,
@@ -24,18 +50,39 @@ def send_message(
     to_agent: str,
     msg_type: str,
     payload: Dict[str, Any],
+    transport: str = INPROC,
 ) -> None:
     """
-    Append a new A2A message to the call state.
+    Deliver an A2A message.
+
+    For types in TYPED_FIELDS, the payload is stored on the CallState
+    field of that name. The full envelope is appended to state.messages
+    for non-inproc transports, and for every other message type.
+    """
+    typed = msg_type in TYPED_FIELDS
+    if typed:
+        setattr(state, msg_type, payload)
+    if typed and transport == INPROC:
+        return
+
+    msg = {
+        "from": from_agent,
+        "to": to_agent,
+        "type": msg_type,
+        "payload": payload,
+    }
+    state.messages.append(msg)
+    index_message(state, len(state.messages) - 1)
+
+
+def index_message(state: CallState, position: int) -> None:
+    """
+    Add the envelope at state.messages[position] to state.messages_index.
+    Envelopes must be indexed in the order they were appended.
     """
-    state.messages.append(
-        {
-            "from": from_agent,
-            "to": to_agent,
-            "type": msg_type,
-            "payload": payload,
-        }
-    )
+    msg = state.messages[position]
+    state.messages_index[(msg["to"], msg["type"])].append(position)
+    state.messages_index[(msg["to"], "*")].append(position)
 
 
 def get_messages_for_agent(
@@ -45,13 +92,13 @@ def get_messages_for_agent(
     msg_type: str | None = None,
 ) -> List[Dict[str, Any]]:
     """
-    Retrieve messages addressed to a given agent (and optional type filter).
+    Retrieve messages addressed to a given agent or to "any" (and optional
+    type filter), in the order they were sent.
     """
-    msgs = [
-        m
-        for m in state.messages
-        if m.get("to") in (agent_name, "any")
-    ]
-    if msg_type is not None:
-        msgs = [m for m in msgs if m.get("type") == msg_type]
-    return msgs
+    key = msg_type or "*"
+    index = state.messages_index
+    positions = index.get((agent_name, key), [])
+    if agent_name != "any":
+        # both lists are ascending, so a merge restores the send order
+        positions = heapq.merge(positions, index.get(("any", key), []))
+    return [state.messages[i] for i in positions]
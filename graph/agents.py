@@ -5,54 +5,60 @@ Agent registry and execution order for the CallSense multi-agent system.
 
 This module provides:
 - A common AgentFn type alias.
-- A registry mapping string names → agent callables.
+- A registry mapping string names → where each agent is defined.
 - A default execution order used by the Supervisor.
+- Dependency-ordered stages for concurrent execution.
+- A fused variant of both (USE_FUSED) built around fused_analysis.
 
 The Supervisor can:
 - Run agents in sequence using AGENT_EXECUTION_ORDER.
 - Address agents by name (e.g., for debugging, conditional runs).
+
+Agent modules are imported on first use (get_agent), so importing this
+module stays cheap and a script that only needs a couple of agents never
+loads the rest.
 """
 
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
+import importlib
+import os
 
 from graph.state import CallState
 from graph.tools import Tools
 
-# Import individual agent implementations
-from agents.cleaning import cleaning_agent
-from agents.entities import entities_agent
-from agents.summarization import summarization_agent
-from agents.sentiment import sentiment_agent
-from agents.frustration_loop import frustration_loop_agent
-from agents.pain_points import pain_points_agent
-from agents.actions import actions_agent
-from agents.evaluation import evaluation_agent
-from typing import Callable, Dict, List, Optional
-from graph.tools import Tools
-
 
 # Type alias for all agents:
 # Each agent takes (CallState, Tools|None) and returns an updated CallState.
 AgentFn = Callable[[CallState, Optional[Tools]], CallState]
 
 
-#: Registry mapping agent names → agent functions.
+#: Registry mapping agent names → (module, function name).
 #: The names are what the Supervisor can use to refer to them.
-AGENT_REGISTRY: Dict[str, AgentFn] = {
-    "cleaning": cleaning_agent,
-    "entities": entities_agent,
-    "summarization": summarization_agent,
-    "sentiment": sentiment_agent,
-    "frustration_loop": frustration_loop_agent,
-    "pain_points": pain_points_agent,
-    "actions": actions_agent,
-    "evaluation": evaluation_agent,
+AGENT_MODULES: Dict[str, Tuple[str, str]] = {
+    "cleaning": ("agents.cleaning", "cleaning_agent"),
+    "entities": ("agents.entities", "entities_agent"),
+    "summarization": ("agents.summarization", "summarization_agent"),
+    "sentiment": ("agents.sentiment", "sentiment_agent"),
+    "frustration_loop": ("agents.frustration_loop", "frustration_loop_agent"),
+    "pain_points": ("agents.pain_points", "pain_points_agent"),
+    "actions": ("agents.actions", "actions_agent"),
+    "evaluation": ("agents.evaluation", "evaluation_agent"),
+    "emotion": ("agents.emotion", "emotion_agent"),
+    "fused_analysis": ("agents.fused_analysis", "fused_analysis_agent"),
 }
 
+# resolved callables, keyed by attribute name
+_RESOLVED: Dict[str, Callable] = {}
+
+
+#: USE_FUSED=1 swaps summarization, sentiment and pain_points for the single
+#: fused_analysis agent (one LLM call instead of three).
+USE_FUSED = os.getenv("USE_FUSED", "").strip().lower() in ("1", "true", "yes")
+
 
 #: Default linear execution order for a full call analysis
 #: (excluding evaluation, which Supervisor may call separately).
-AGENT_EXECUTION_ORDER: List[str] = [
+PER_AGENT_EXECUTION_ORDER: List[str] = [
     "cleaning",
     "entities",
     "summarization",
@@ -64,17 +70,78 @@ AGENT_EXECUTION_ORDER: List[str] = [
 ]
 
 
-def get_agent(name: str) -> AgentFn:
-    """
-    Convenience helper to fetch an agent by name.
+#: Same agents as PER_AGENT_EXECUTION_ORDER, grouped into stages whose members
+#: only depend on earlier stages, so each stage can run concurrently:
+#: - entities / frustration_loop only need the cleaned utterances
+#: - summarization reads the entity_summary A2A message
+#: - sentiment / pain_points both read the summary
+#: - actions reads sentiment and pain points
+PER_AGENT_STAGES: List[List[str]] = [
+    ["cleaning"],
+    ["entities", "frustration_loop"],
+    ["summarization"],
+    ["sentiment", "pain_points"],
+    ["actions"],
+]
 
-    Raises:
-        KeyError if the agent name is not registered.
-    """
+
+#: Execution order with fused_analysis. frustration_loop runs before it
+#: because the pain points read the frustration_summary A2A message.
+FUSED_EXECUTION_ORDER: List[str] = [
+    "cleaning",
+    "entities",
+    "frustration_loop",
+    "fused_analysis",
+    "actions",
+]
+
+FUSED_STAGES: List[List[str]] = [
+    ["cleaning"],
+    ["entities", "frustration_loop"],
+    ["fused_analysis"],
+    ["actions"],
+]
+
+
+AGENT_EXECUTION_ORDER: List[str] = (
+    FUSED_EXECUTION_ORDER if USE_FUSED else PER_AGENT_EXECUTION_ORDER
+)
+AGENT_STAGES: List[List[str]] = FUSED_STAGES if USE_FUSED else PER_AGENT_STAGES
+
+
+def _resolve(name: str, suffix: str = "") -> Callable:
     try:
-        return AGENT_REGISTRY[name]
+        module_name, attr = AGENT_MODULES[name]
     except KeyError:
         raise KeyError(
             f"Unknown agent name: {name!r}. "
-            f"Known agents: {list(AGENT_REGISTRY.keys())}"
+            f"Known agents: {list(AGENT_MODULES.keys())}"
         )
+    attr += suffix
+    fn = _RESOLVED.get(attr)
+    if fn is None:
+        fn = getattr(importlib.import_module(module_name), attr)
+        _RESOLVED[attr] = fn
+    return fn
+
+
+def get_agent(name: str) -> AgentFn:
+    """
+    Convenience helper to fetch an agent by name, importing its module
+    on first use.
+
+    Raises:
+        KeyError if the agent name is not registered.
+    """
+    return _resolve(name)
+
+
+def get_batch_agent(name: str) -> Callable[[List[CallState], Optional[Tools]], List[CallState]]:
+    """
+    Fetch the batched variant (`<agent>_batch`) of a registered agent.
+
+    Raises:
+        KeyError if the agent name is not registered.
+        AttributeError if the agent has no batched variant.
+    """
+    return _resolve(name, "_batch")
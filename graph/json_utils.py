@@ -0,0 +1,113 @@
+# graph/json_utils.py
+
+"""
+JSON helpers shared by the agents.
+
+Uses orjson (a much faster parser/serializer) when it is installed and
+falls back to the standard library `json` module otherwise.
+
+`loads_lenient` tolerates the usual LLM wrapping around a JSON answer
+(markdown code fences, leading/trailing prose).
+"""
+
+from __future__ import annotations
+from typing import Any, Iterator, Tuple
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional dependency, fall back to stdlib json
+    orjson = None
+
+
+#: Raised by `loads` on malformed input (orjson's error subclasses it).
+JSONDecodeError = json.JSONDecodeError
+
+_FENCE_RE = re.compile(r"^```(?:json)?|```$", re.IGNORECASE)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Parse a JSON document.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_compact(obj: Any) -> str:
+    """
+    Serialize without whitespace (used when embedding JSON in prompts;
+    indentation only costs input tokens).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _balanced_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) of each top-level balanced {...} / [...] block, left
+    to right. Brackets inside JSON strings are ignored, and blocks nested in
+    an earlier one are never yielded on their own: a reply cut off mid-block
+    yields nothing from that point on, rather than one of its inner items.
+    """
+    start = 0
+    while True:
+        starts = [i for i in (text.find("{", start), text.find("[", start)) if i != -1]
+        if not starts:
+            return
+        start = min(starts)
+
+        stack = []
+        in_string = escaped = False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in _CLOSERS:
+                stack.append(_CLOSERS[ch])
+            elif ch in "}]":
+                if ch != stack.pop():
+                    break  # mismatched: skip the whole region
+                if not stack:
+                    yield start, i + 1
+                    break
+        else:
+            return  # still open at the end of the text: truncated
+
+        start = i + 1
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    Parse JSON from an LLM answer.
+
+    Strips markdown code fences, then tries a strict parse; if that fails,
+    parses the first balanced JSON object/array embedded in the text.
+
+    Raises:
+        JSONDecodeError if no valid JSON document can be found.
+    """
+    stripped = _FENCE_RE.sub("", text.strip()).strip()
+    try:
+        return loads(stripped)
+    except JSONDecodeError:
+        pass
+
+    for start, end in _balanced_spans(stripped):
+        try:
+            return loads(stripped[start:end])
+        except JSONDecodeError:
+            continue
+
+    raise JSONDecodeError("No JSON document found", text, 0)
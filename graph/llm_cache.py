@@ -0,0 +1,587 @@
+# graph/llm_cache.py
+
+"""
+Semantic prompt cache for LLM calls made by the CallSense agents.
+
+CachedLLM wraps an OpenAI (or compatible) client and intercepts
+`chat.completions.create`. Before a request goes over the network, the
+prompt is looked up in a SemanticCache:
+
+- exact hit: same model/temperature/system prompt and identical user prompt
+- semantic hit (optional): same model/temperature/system prompt and a user
+  prompt whose embedding has cosine similarity >= `similarity_threshold`
+
+On a hit, a lightweight completion object is returned that exposes
+`choices[0].message.content`, so agent code does not change. Streamed
+requests (stream=True) are cached too: a hit replays the stored text as a
+single chunk exposing `choices[0].delta.content`, and a miss records the
+streamed text only if the stream completed (finish_reason "stop") or the
+caller closed it on purpose after reading what it needed. A stream that
+fails midway is never recorded.
+
+Entries are persisted in SQLite and evicted least-recently-used once
+`max_entries` is exceeded (down to EVICT_TO of it, so a full cache does not
+evict on every insert). The most recently used exact entries are also
+kept in an in-process LRU, so a repeat hit (e.g. re-clicking "Analyze")
+does not wait on SQLite; its last_used update is written later, in a batch.
+
+Semantic lookups scan the namespace's vectors as one matrix product when
+numpy is installed, and row by row otherwise.
+"""
+
+from __future__ import annotations
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from operator import mul
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, fall back to a pure-Python scan
+    np = None
+
+
+EmbedFn = Callable[[str], Sequence[float]]
+
+DEFAULT_CACHE_PATH = os.path.join(".callsense_cache", "llm_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_SIMILARITY_THRESHOLD = 0.97
+DEFAULT_MEMORY_ENTRIES = 1024
+#: A full cache evicts down to this fraction of max_entries in one go.
+EVICT_TO = 0.9
+#: In-process hits update last_used in SQLite once this many are pending
+#: (and always before evicting).
+TOUCH_BATCH = 64
+
+
+# ---------- completion shims returned on cache hits ---------- #
+
+@dataclass
+class CachedMessage:
+    content: str
+    role: str = "assistant"
+
+
+@dataclass
+class CachedChoice:
+    message: CachedMessage
+    index: int = 0
+    finish_reason: str = "stop"
+
+
+@dataclass
+class CachedStreamChoice:
+    delta: CachedMessage
+    index: int = 0
+    finish_reason: str = "stop"
+
+
+@dataclass
+class CachedCompletion:
+    """
+    Minimal stand-in for an OpenAI ChatCompletion (or, with
+    CachedStreamChoice, a streamed chunk) served from the cache.
+    """
+    model: str
+    choices: List[Any] = field(default_factory=list)
+    cached: bool = True
+
+
+# ---------- helpers ---------- #
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _split_messages(messages: Sequence[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Split chat messages into (system prompt, user prompt) strings.
+    """
+    system_parts: List[str] = []
+    user_parts: List[str] = []
+    for m in messages:
+        content = m.get("content") or ""
+        if m.get("role") == "system":
+            system_parts.append(content)
+        else:
+            user_parts.append(content)
+    return "\n".join(system_parts), "\n".join(user_parts)
+
+
+def _namespace(request: Dict[str, Any], system_prompt: str) -> str:
+    """
+    Everything except the user prompt must match for two requests
+    to share a cache entry (model, temperature, system prompt, ...).
+    """
+    params = {k: v for k, v in request.items() if k != "messages"}
+    params_json = json.dumps(params, sort_keys=True, default=str)
+    return _sha256(params_json + "\x00" + _sha256(system_prompt))
+
+
+def _normalize(vector: Sequence[float]) -> Optional[array]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return None
+    return array("f", (x / norm for x in vector))
+
+
+def openai_embedder(client: Any, model: str = "text-embedding-3-small") -> EmbedFn:
+    """
+    Build an EmbedFn backed by the OpenAI embeddings endpoint.
+    """
+    def _embed(text: str) -> Sequence[float]:
+        response = client.embeddings.create(model=model, input=text)
+        return response.data[0].embedding
+
+    return _embed
+
+
+# ---------- vector index ---------- #
+
+class _VectorIndex:
+    """
+    (prompt_hash, unit vector) rows of one namespace.
+
+    Rows live in one float32 matrix when numpy is available (grown by
+    doubling), else in a list of arrays. Rows are only ever appended in
+    place; dropping rows builds a new index. So a snapshot (hashes, rows,
+    n) taken under the cache lock stays valid while it is scanned without
+    the lock.
+    """
+
+    def __init__(self, dim: Optional[int] = None) -> None:
+        self.dim = dim
+        self._hashes: List[str] = []
+        self._rows: Any = None if np is not None else []
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def append(self, prompt_hash: str, vector: Any) -> None:
+        if self.dim is None:
+            self.dim = len(vector)
+        elif len(vector) != self.dim:
+            return  # different embedding model; never comparable
+        n = len(self._hashes)
+        if np is None:
+            self._rows.append(vector)
+        else:
+            if self._rows is None or n == len(self._rows):
+                grown = np.empty((max(16, 2 * n), self.dim), dtype=np.float32)
+                if n:
+                    grown[:n] = self._rows[:n]
+                self._rows = grown
+            self._rows[n] = np.frombuffer(vector, dtype=np.float32)
+        self._hashes.append(prompt_hash)
+
+    def without(self, prompt_hashes: Iterable[str]) -> "_VectorIndex":
+        drop = set(prompt_hashes)
+        index = _VectorIndex(self.dim)
+        rows = self._rows
+        for i, prompt_hash in enumerate(self._hashes):
+            if prompt_hash not in drop:
+                index.append(prompt_hash, rows[i])
+        return index
+
+    def snapshot(self) -> Tuple[List[str], Any, int]:
+        return self._hashes, self._rows, len(self._hashes)
+
+
+def _best_match(
+    snapshot: Tuple[List[str], Any, int],
+    embedding: array,
+    threshold: float,
+) -> Optional[str]:
+    """
+    Hash of the row most similar to `embedding`, if it reaches `threshold`.
+    """
+    hashes, rows, n = snapshot
+    if not n:
+        return None
+    if np is not None:
+        if len(embedding) != rows.shape[1]:
+            return None
+        scores = rows[:n] @ np.frombuffer(embedding, dtype=np.float32)
+        best = int(np.argmax(scores))
+        return hashes[best] if scores[best] >= threshold else None
+
+    best_hash: Optional[str] = None
+    best_score = threshold
+    for i in range(n):
+        score = sum(map(mul, embedding, rows[i]))
+        if score >= best_score:
+            best_hash, best_score = hashes[i], score
+    return best_hash
+
+
+# ---------- in-process LRU ---------- #
+
+class LRUCache:
+    """
+    Small thread-safe in-memory LRU mapping.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_ENTRIES) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ---------- SQLite-backed semantic cache ---------- #
+
+class SemanticCache:
+    """
+    Disk-backed prompt → completion cache with optional embedding lookup.
+
+    Args:
+        path: SQLite file (":memory:" for a process-local cache)
+        max_entries: LRU capacity; least recently used entries are evicted
+        similarity_threshold: minimum cosine similarity for a semantic hit
+        embed_fn: text → vector function; if None only exact hits are served
+        memory_entries: size of the in-process LRU in front of SQLite (0 disables)
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        embed_fn: Optional[EmbedFn] = None,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ) -> None:
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self._memory = LRUCache(min(memory_entries, max_entries))
+        # (namespace, prompt_hash) → time of the last in-process hit
+        self._touched: Dict[Tuple[str, str], float] = {}
+        self._touched_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                namespace   TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                embedding   BLOB,
+                content     TEXT NOT NULL,
+                last_used   REAL NOT NULL,
+                PRIMARY KEY (namespace, prompt_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_completions_last_used "
+            "ON completions (last_used)"
+        )
+        self._conn.commit()
+
+        # namespace → its embedded entries, loaded lazily
+        self._vectors: Dict[str, _VectorIndex] = {}
+
+    # ----- public API ----- #
+
+    def embed(self, text: str) -> Optional[array]:
+        """
+        Embed and L2-normalize a prompt; None if embeddings are unavailable.
+        """
+        if self.embed_fn is None:
+            return None
+        try:
+            return _normalize(self.embed_fn(text))
+        except Exception:
+            # Embedding failures only disable the semantic lookup.
+            return None
+
+    def get(self, namespace: str, prompt: str) -> Optional[str]:
+        """
+        Exact lookup by prompt hash (memory first, then SQLite).
+        """
+        key = (namespace, _sha256(prompt))
+        content = self._memory.get(key)
+        if content is not None:
+            self._note_hit(key)
+        else:
+            content = self._touch(*key)
+            if content is not None:
+                self._memory.set(key, content)
+        return content
+
+    def get_similar(self, namespace: str, embedding: array) -> Optional[str]:
+        """
+        Nearest-neighbour lookup among entries in the same namespace.
+        """
+        with self._lock:
+            snapshot = self._load_vectors(namespace).snapshot()
+        # scan without the lock, so inserts and exact hits are not blocked
+        best_hash = _best_match(snapshot, embedding, self.similarity_threshold)
+
+        if best_hash is None:
+            return None
+        return self._touch(namespace, best_hash)
+
+    def set(
+        self,
+        namespace: str,
+        prompt: str,
+        content: str,
+        embedding: Optional[array] = None,
+    ) -> None:
+        prompt_hash = _sha256(prompt)
+        blob = embedding.tobytes() if embedding is not None else None
+        self._memory.set((namespace, prompt_hash), content)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions "
+                "(namespace, prompt_hash, embedding, content, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, prompt_hash, blob, content, time.time()),
+            )
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+
+            if embedding is not None and namespace in self._vectors:
+                self._vectors[namespace].append(prompt_hash, embedding)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+            self._vectors.clear()
+        self._memory.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()
+        return count
+
+    # ----- internals ----- #
+
+    def _touch(self, namespace: str, prompt_hash: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM completions WHERE namespace = ? AND prompt_hash = ?",
+                (namespace, prompt_hash),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE completions SET last_used = ? WHERE namespace = ? AND prompt_hash = ?",
+                (time.time(), namespace, prompt_hash),
+            )
+            self._conn.commit()
+        return row[0]
+
+    def _note_hit(self, key: Tuple[str, str]) -> None:
+        with self._touched_lock:
+            self._touched[key] = time.time()
+            full = len(self._touched) >= TOUCH_BATCH
+        if full:
+            with self._lock:
+                self._flush_touched()
+                self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """
+        Write pending in-process hits to last_used (caller holds self._lock).
+        """
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            self._conn.executemany(
+                "UPDATE completions SET last_used = MAX(last_used, ?) "
+                "WHERE namespace = ? AND prompt_hash = ?",
+                [(used, ns, prompt_hash) for (ns, prompt_hash), used in touched.items()],
+            )
+
+    def _load_vectors(self, namespace: str) -> _VectorIndex:
+        if namespace not in self._vectors:
+            rows = self._conn.execute(
+                "SELECT prompt_hash, embedding FROM completions "
+                "WHERE namespace = ? AND embedding IS NOT NULL",
+                (namespace,),
+            ).fetchall()
+            index = _VectorIndex()
+            for prompt_hash, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                index.append(prompt_hash, vector)
+            self._vectors[namespace] = index
+        return self._vectors[namespace]
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()
+        if count <= self.max_entries:
+            return
+        victims = self._conn.execute(
+            "SELECT rowid, namespace, prompt_hash FROM completions "
+            "ORDER BY last_used ASC LIMIT ?",
+            (count - int(self.max_entries * EVICT_TO),),
+        ).fetchall()
+        self._conn.executemany(
+            "DELETE FROM completions WHERE rowid = ?", [(rowid,) for rowid, _, _ in victims]
+        )
+
+        # drop the evicted entries from the loaded vector indexes
+        evicted: Dict[str, List[str]] = {}
+        for _, namespace, prompt_hash in victims:
+            if namespace in self._vectors:
+                evicted.setdefault(namespace, []).append(prompt_hash)
+        for namespace, prompt_hashes in evicted.items():
+            self._vectors[namespace] = self._vectors[namespace].without(prompt_hashes)
+
+
+# ---------- client adapter ---------- #
+
+class CachedLLM:
+    """
+    Drop-in wrapper around an OpenAI-style client.
+
+    Only `chat.completions.create` is intercepted; every other attribute
+    is forwarded to the wrapped client.
+    """
+
+    def __init__(self, llm: Any, cache: SemanticCache) -> None:
+        self.llm = llm
+        self.cache = cache
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _create(self, **kwargs: Any) -> Any:
+        # Multi-choice requests are passed straight through.
+        if kwargs.get("n", 1) != 1:
+            return self.llm.chat.completions.create(**kwargs)
+        stream = bool(kwargs.get("stream"))
+
+        system_prompt, user_prompt = _split_messages(kwargs.get("messages", []))
+        namespace = _namespace(kwargs, system_prompt)
+
+        content = self.cache.get(namespace, user_prompt)
+        embedding = None
+        if content is None:
+            embedding = self.cache.embed(user_prompt)
+            if embedding is not None:
+                content = self.cache.get_similar(namespace, embedding)
+
+        if content is not None:
+            if stream:
+                return iter([
+                    CachedCompletion(
+                        model=kwargs.get("model", ""),
+                        choices=[CachedStreamChoice(delta=CachedMessage(content=content))],
+                    )
+                ])
+            return CachedCompletion(
+                model=kwargs.get("model", ""),
+                choices=[CachedChoice(message=CachedMessage(content=content))],
+            )
+
+        completion = self.llm.chat.completions.create(**kwargs)
+        if stream:
+            return _RecordingStream(
+                completion,
+                lambda text: self.cache.set(namespace, user_prompt, text, embedding),
+            )
+        content = completion.choices[0].message.content
+        if content:
+            self.cache.set(namespace, user_prompt, content, embedding)
+        return completion
+
+
+class _RecordingStream:
+    """
+    Pass-through wrapper for a streamed completion that stores the text
+    the caller consumed once the stream completes normally or is closed
+    by the caller. Errors, and streams that end without
+    finish_reason == "stop" (length cut-off, content filter), record nothing.
+    """
+
+    def __init__(self, stream: Any, on_done: Callable[[str], None]) -> None:
+        self._stream = stream
+        self._on_done = on_done
+        self._parts: List[str] = []
+        self._done = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def __iter__(self):
+        finish_reason = None
+        try:
+            for chunk in self._stream:
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    piece = choice.delta.content
+                    if piece:
+                        self._parts.append(piece)
+                    finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+                yield chunk
+        except GeneratorExit:
+            # the consumer stopped iterating; an explicit close() records
+            raise
+        except BaseException:
+            self._done = True  # partial text must never be cached
+            raise
+
+        if finish_reason == "stop":
+            self._finish()
+        else:
+            self._done = True
+
+    def close(self) -> None:
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+        self._finish()
+
+    def _finish(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        text = "".join(self._parts)
+        if text:
+            self._on_done(text)
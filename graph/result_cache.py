@@ -0,0 +1,74 @@
+# graph/result_cache.py
+
+"""
+Exact-match cache of full pipeline results.
+
+Replaying a transcript that was already analyzed (dev loops, CI, eval
+reruns, re-clicking "Analyze" in the UI) returns the stored CallState
+without running any agent or LLM call.
+
+Entries are keyed by a BLAKE2b hash of the raw transcript plus the
+pipeline settings that change its output, and stored as one pickle file
+per key.
+"""
+
+from __future__ import annotations
+from typing import Optional
+import hashlib
+import os
+import pickle
+import tempfile
+
+from graph.state import CallState
+
+
+DEFAULT_RESULT_CACHE_DIR = os.path.join(".callsense_cache", "callstate")
+
+#: Bump when prompts/agents change so stale results are not served.
+CACHE_VERSION = 7
+
+
+class ResultCache:
+    """
+    Directory-backed transcript → CallState cache.
+    """
+
+    def __init__(self, directory: str = DEFAULT_RESULT_CACHE_DIR) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(raw_transcript: str, variant: str = "") -> str:
+        """
+        Cache key for a transcript; `variant` names the pipeline settings
+        (model, fused mode, ...) that produced the result.
+        """
+        h = hashlib.blake2b(digest_size=32)
+        h.update(f"v{CACHE_VERSION}|{variant}\x00".encode("utf-8"))
+        h.update(raw_transcript.encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[CallState]:
+        try:
+            with open(self._path(key), "rb") as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        return cached if isinstance(cached, CallState) else None
+
+    def set(self, key: str, call_state: CallState) -> None:
+        # write-then-rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(call_state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
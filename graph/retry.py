@@ -0,0 +1,120 @@
+# graph/retry.py
+
+"""
+Error policy for LLM calls made by the CallSense agents.
+
+- Transient failures (connection errors, timeouts, 429 rate limits) are
+  retried by RetryingLLM with jittered exponential backoff, so threads that
+  failed together do not retry in lockstep.
+- Agents fall back to their rule-based path only for
+  - LLM_ERRORS, caught around the request itself (and around reading a
+    streamed answer): API/transport errors that survived the retries, and
+    transport errors raised mid-stream, which the SDK does not wrap
+  - PARSE_ERRORS, caught around parsing the answer: JSON that does not
+    decode, or values that do not convert (the agents check shapes with
+    isinstance instead of catching TypeError/KeyError)
+  Anything else is a bug in the agent and propagates.
+"""
+
+from __future__ import annotations
+from types import SimpleNamespace
+from typing import Any, Callable, Tuple, Type
+import random
+import time
+
+try:  # optional: the OpenAI SDK defines the precise error types
+    import openai
+except ImportError:  # pragma: no cover - depends on environment
+    openai = None
+
+try:  # optional: the transport under the OpenAI SDK
+    import httpx
+except ImportError:  # pragma: no cover - depends on environment
+    httpx = None
+
+
+ErrorTypes = Tuple[Type[BaseException], ...]
+
+#: Raised while a streamed response is being read (e.g. httpx.ReadError,
+#: httpx.RemoteProtocolError); the SDK passes these through unwrapped.
+STREAM_ERRORS: ErrorTypes = (httpx.TransportError,) if httpx is not None else ()
+
+if openai is not None:
+    # APITimeoutError is a subclass of APIConnectionError
+    RETRYABLE_ERRORS: ErrorTypes = (openai.APIConnectionError, openai.RateLimitError)
+    LLM_ERRORS: ErrorTypes = (openai.OpenAIError,) + STREAM_ERRORS
+else:
+    RETRYABLE_ERRORS = (ConnectionError, TimeoutError)
+    LLM_ERRORS = RETRYABLE_ERRORS + STREAM_ERRORS
+
+#: Malformed model output: JSON decode errors from json_utils and failed
+#: value conversions (float("high")) are both ValueErrors.
+PARSE_ERRORS: ErrorTypes = (ValueError,)
+
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.2
+DEFAULT_MAX_DELAY = 2.0
+
+
+def call_with_retry(
+    fn: Callable[..., Any],
+    *args: Any,
+    attempts: int = DEFAULT_ATTEMPTS,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    retry_on: ErrorTypes = RETRYABLE_ERRORS,
+    sleep: Callable[[float], None] = time.sleep,
+    **kwargs: Any,
+) -> Any:
+    """
+    Call `fn`, retrying `retry_on` errors with exponential backoff
+    (base_delay, 2*base_delay, ... capped at max_delay); each wait is
+    drawn uniformly from [delay/2, delay].
+    """
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            sleep(random.uniform(delay / 2, delay))
+
+
+class RetryingLLM:
+    """
+    Drop-in wrapper that retries `chat.completions.create` on transient
+    errors; every other attribute is forwarded to the wrapped client.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        attempts: int = DEFAULT_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ) -> None:
+        self.llm = llm
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _create(self, **kwargs: Any) -> Any:
+        return call_with_retry(
+            self.llm.chat.completions.create,
+            attempts=self.attempts,
+            base_delay=self.base_delay,
+            max_delay=self.max_delay,
+            **kwargs,
+        )
+
+
+def completion_text(completion: Any) -> str:
+    """
+    Text of a non-streamed completion ("" if the model returned no content).
+    """
+    return (completion.choices[0].message.content or "").strip()
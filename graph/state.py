@@ -1,10 +1,20 @@
 # graph/state.py
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Optional, Any, Tuple
+import os
+import sys
+import tempfile
 import time
 
+from graph import json_utils
 
-@dataclass
+
+# __slots__ dataclasses (no per-instance __dict__) need Python 3.10+.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class CallState:
     """
     Per-call, in-memory state.
@@ -17,6 +27,13 @@ class CallState:
     cleaned_transcript: str = ""
     utterances: List[str] = field(default_factory=list)
 
+    # lowercased copies (set once by cleaning, reused by rule-based fallbacks)
+    cleaned_transcript_lower: str = ""
+    utterances_lower: List[str] = field(default_factory=list)
+
+    # numbered "1. ..." listing of utterances, reused by per-utterance prompts
+    utterance_block: str = ""
+
     # extracted structure
     entities: Dict[str, Any] = field(default_factory=dict)
     summary: str = ""
@@ -25,8 +42,17 @@ class CallState:
     pain_points: List[str] = field(default_factory=list)
     recommended_actions: List[str] = field(default_factory=list)
 
+    # A2A payloads, written directly by in-process senders (see graph/a2a.py)
+    entity_summary: Dict[str, Any] = field(default_factory=dict)
+    frustration_summary: Dict[str, Any] = field(default_factory=dict)
+    sentiment_signal: Dict[str, Any] = field(default_factory=dict)
+
     # 🔹 A2A messages: each message is a dict with from/to/type/payload
     messages: List[Dict[str, Any]] = field(default_factory=list)
+    # positions in `messages`, keyed by (to, type) and (to, "*") — see graph/a2a.py
+    messages_index: Dict[Tuple[str, str], List[int]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
 
     # evaluation metrics (filled by supervisor + evaluation agent)
     evaluation: Dict[str, Any] = field(default_factory=dict)
@@ -36,18 +62,80 @@ class CallState:
     step_count: int = 0
     tool_calls: int = 0
     tool_successes: int = 0
+    llm_skipped: int = 0  # LLM calls skipped for trivially short input
+    llm_fallbacks: int = 0  # LLM answers lost (API/parse error) → rule-based output
+    emotion_done: bool = False  # fused emotion_agent has run (tools.fused_mode)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MemoryState:
     """
     Long-term memory across calls (Memory Bank style).
     """
-    pain_point_counts: Dict[str, int] = field(default_factory=dict)
-    sentiment_counts: Dict[str, int] = field(default_factory=dict)
-    product_issue_counts: Dict[str, int] = field(default_factory=dict)
+    pain_point_counts: "Counter[str]" = field(default_factory=Counter)
+    sentiment_counts: "Counter[str]" = field(default_factory=Counter)
+    product_issue_counts: "Counter[str]" = field(default_factory=Counter)
 
     total_calls: int = 0
     avg_faithfulness: float = 0.0
     avg_coverage: float = 0.0
     avg_consistency: float = 0.0
+
+    def save(self, path: str) -> None:
+        """
+        Write the memory to `path` as JSON (atomically: write, then rename).
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json_utils.dumps_compact(
+                    {fld.name: getattr(self, fld.name) for fld in fields(self)}
+                ))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "MemoryState":
+        """
+        Read a memory written by `save`; a missing, unreadable or
+        wrongly shaped file gives an empty MemoryState.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = json_utils.loads(f.read())
+        except (OSError, json_utils.JSONDecodeError):
+            return cls()
+        if not isinstance(data, dict):
+            return cls()
+
+        memory = cls()
+        try:
+            for f in fields(cls):
+                if f.name not in data:
+                    continue
+                setattr(memory, f.name, _checked_field(getattr(memory, f.name), data[f.name]))
+        except (TypeError, ValueError, OverflowError):
+            return cls()
+        return memory
+
+
+def _checked_field(default: Any, value: Any) -> Any:
+    """
+    `value` converted to the type of the field `default` came from;
+    TypeError if it has the wrong shape.
+    """
+    if isinstance(default, Counter):
+        if not isinstance(value, dict) or not all(_is_number(n) for n in value.values()):
+            raise TypeError("expected an object of counts")
+        return Counter(value)
+    if not _is_number(value):
+        raise TypeError("expected a number")
+    return type(default)(value)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
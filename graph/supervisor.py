@@ -4,24 +4,215 @@
 Supervisor orchestrates the multi-agent CallSense pipeline.
 
 - Initializes CallState
-- Applies agents in sequence
+- Applies agents stage-wise concurrently (AGENT_STAGES), or in sequence
 - Passes shared Tools container (LLM, MCP cleaner, data loader)
 - Supports A2A message protocol through CallState.messages
-- Tracks MemoryState for long-term trends (optional)
+- Tracks MemoryState for long-term trends (optional), updated by a
+  background thread so results are returned without waiting for it, and
+  persisted to disk so trends survive restarts
 """
 
 from __future__ import annotations
-from typing import Optional
+from dataclasses import fields
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, List, Optional, Tuple, TypeVar
+import asyncio
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+import time
 
 from graph.state import CallState, MemoryState
-from graph.tools import Tools, default_tools
-from graph.agents import AGENT_EXECUTION_ORDER, get_agent
-from typing import Optional
+from graph.tools import (
+    DEFAULT_MODEL,
+    FAST_MODEL,
+    FAST_MODEL_MAX_CHARS,
+    MIN_LLM_CHARS,
+    Tools,
+    default_tools,
+)
+from graph.llm_cache import SemanticCache
+from graph.result_cache import ResultCache
+from graph.agents import (
+    AGENT_EXECUTION_ORDER,
+    AGENT_MODULES,
+    USE_FUSED,
+    get_agent,
+    get_batch_agent,
+)
+from agents.pipeline import run_stages_async
+from eval.metrics import update_memory_from_call
 
 
-# Optional global memory (can also be stored to disk)
+T = TypeVar("T")
+
+
+# Optional global memory, persisted to MEMORY_PATH
 GLOBAL_MEMORY = MemoryState()
 
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#: Where GLOBAL_MEMORY is saved (inside the repo by default, whatever the
+#: working directory); set CALLSENSE_MEMORY_PATH="" to keep it in memory only.
+MEMORY_PATH = os.getenv(
+    "CALLSENSE_MEMORY_PATH", os.path.join(_REPO_ROOT, ".callsense_cache", "memory.json")
+)
+#: Writes are debounced: after this many updates, or once updates have
+#: been pending (or the queue idle) for this many seconds.
+SAVE_EVERY_CALLS = 10
+SAVE_INTERVAL_S = 5.0
+#: At exit, wait at most this long for queued updates before the last save.
+EXIT_FLUSH_TIMEOUT_S = 10.0
+
+_log = logging.getLogger(__name__)
+
+# GLOBAL_MEMORY is written only by the memory worker, under _MEMORY_LOCK.
+_MEMORY_LOCK = threading.Lock()
+_mem_queue: "queue.Queue[CallState]" = queue.Queue()
+_mem_worker: Optional[threading.Thread] = None
+_mem_worker_lock = threading.Lock()
+
+# persistence state, guarded by _MEMORY_LOCK
+_memory_loaded = False
+_unsaved_calls = 0
+_last_save = time.monotonic()
+
+
+def load_memory() -> MemoryState:
+    """
+    Fill GLOBAL_MEMORY from MEMORY_PATH (once per process) and return it.
+    """
+    global _memory_loaded
+    with _MEMORY_LOCK:
+        if not _memory_loaded:
+            _memory_loaded = True
+            if MEMORY_PATH:
+                loaded = MemoryState.load(MEMORY_PATH)
+                # in place: callers may hold a reference to GLOBAL_MEMORY
+                for f in fields(MemoryState):
+                    setattr(GLOBAL_MEMORY, f.name, getattr(loaded, f.name))
+    return GLOBAL_MEMORY
+
+
+def _save_locked() -> None:
+    global _unsaved_calls, _last_save
+    if not _memory_loaded:
+        # an empty, never-loaded memory must not replace the saved one
+        return
+    _unsaved_calls = 0
+    _last_save = time.monotonic()
+    if not MEMORY_PATH:
+        return
+    try:
+        GLOBAL_MEMORY.save(MEMORY_PATH)
+    except OSError:
+        _log.exception("could not save memory to %s", MEMORY_PATH)
+
+
+def save_memory() -> None:
+    """
+    Write GLOBAL_MEMORY to MEMORY_PATH now (queued updates not included).
+    Does nothing until load_memory has run.
+    """
+    with _MEMORY_LOCK:
+        _save_locked()
+
+
+def _save_pending_memory() -> None:
+    with _MEMORY_LOCK:
+        if _unsaved_calls:
+            _save_locked()
+
+
+@atexit.register
+def _save_memory_at_exit() -> None:
+    # the worker is a daemon thread: let it apply what is still queued
+    if _mem_worker is not None and _mem_worker.is_alive():
+        if not flush_memory_updates(timeout=EXIT_FLUSH_TIMEOUT_S):
+            _log.warning("memory updates still queued at exit were not saved")
+    _save_pending_memory()
+
+
+def _memory_worker() -> None:
+    global _unsaved_calls
+    load_memory()
+    while True:
+        try:
+            call_state = _mem_queue.get(timeout=SAVE_INTERVAL_S)
+        except queue.Empty:
+            _save_pending_memory()
+            continue
+
+        try:
+            with _MEMORY_LOCK:
+                update_memory_from_call(GLOBAL_MEMORY, call_state)
+                _unsaved_calls += 1
+                if (
+                    _unsaved_calls >= SAVE_EVERY_CALLS
+                    or time.monotonic() - _last_save >= SAVE_INTERVAL_S
+                ):
+                    _save_locked()
+        except Exception:
+            # keep the worker alive; one bad call must not stop the trends
+            _log.exception("memory update failed for call %s", call_state.call_id)
+        finally:
+            _mem_queue.task_done()
+
+
+def _enqueue_memory_update(call_state: CallState) -> None:
+    global _mem_worker
+    with _mem_worker_lock:
+        if _mem_worker is None:
+            _mem_worker = threading.Thread(
+                target=_memory_worker, name="callsense-memory", daemon=True
+            )
+            _mem_worker.start()
+    _mem_queue.put(call_state)
+
+
+def flush_memory_updates(timeout: Optional[float] = None) -> bool:
+    """
+    Block until every queued call has been folded into GLOBAL_MEMORY,
+    or until `timeout` seconds have passed; returns False on timeout.
+    """
+    if timeout is None:
+        _mem_queue.join()
+        return True
+    deadline = time.monotonic() + timeout
+    with _mem_queue.all_tasks_done:
+        while _mem_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _mem_queue.all_tasks_done.wait(remaining)
+    return True
+
+
+def memory_snapshot() -> MemoryState:
+    """
+    Consistent copy of GLOBAL_MEMORY (updates may still be queued; call
+    flush_memory_updates first to include them).
+    """
+    with _MEMORY_LOCK:
+        return copy.deepcopy(GLOBAL_MEMORY)
+
+
+def _fully_answered(call_state: CallState) -> bool:
+    """
+    True if every agent got its answer from the LLM (no error, no
+    rule-based fallback, no skipped short-transcript call).
+    """
+    return (
+        call_state.tool_successes == call_state.tool_calls
+        and not call_state.llm_skipped
+        and not call_state.llm_fallbacks
+    )
+
+
+# ---------------- single-call analysis ---------------- #
 
 def run_pipeline(
     raw_transcript: str,
@@ -29,6 +220,13 @@ def run_pipeline(
     cleaner=None,
     data_loader=None,
     update_memory: bool = True,
+    llm_cache: Optional[SemanticCache] = None,
+    concurrent: bool = True,
+    fused_mode: bool = False,
+    distributed: bool = False,
+    result_cache: Optional[ResultCache] = None,
+    on_summary_token: Optional[Callable[[str], None]] = None,
+    min_chars_for_llm: int = MIN_LLM_CHARS,
 ) -> CallState:
     """
     Run the full CallSense multi-agent pipeline.
@@ -38,41 +236,277 @@ def run_pipeline(
         llm_client: OpenAI client (or similar)
         cleaner: MCP or custom cleaning tool (optional)
         data_loader: CSV loader (optional)
-        update_memory: whether to update long-term MemoryState
+        update_memory: queue the call for the long-term MemoryState update
+            (applied by a background thread; see flush_memory_updates)
+        llm_cache: semantic prompt cache shared across calls (optional)
+        concurrent: run independent agents in parallel (see AGENT_STAGES);
+            False runs AGENT_EXECUTION_ORDER one agent at a time, on the
+            calling thread and without an event loop
+        fused_mode: one LLM call for sentiment + frustration (emotion agent)
+        distributed: A2A messages also go out as full envelopes in
+            CallState.messages (see graph/a2a.py), not only typed fields
+        result_cache: exact-match cache of full results by transcript (optional)
+        on_summary_token: receives the summary text as it streams (optional;
+            not called when the result comes from `result_cache`)
+        min_chars_for_llm: shorter transcripts use the rule-based agents only
 
     Returns:
         Final CallState with all agent outputs and evaluation results.
+
+    Blocking wrapper around run_pipeline_async. Called while an event loop
+    is running (e.g. in Jupyter), it runs on a worker thread's own loop;
+    async code should await run_pipeline_async instead.
     """
+    if concurrent:
+        return _run_coroutine(
+            run_pipeline_async(
+                raw_transcript,
+                llm_client,
+                cleaner=cleaner,
+                data_loader=data_loader,
+                update_memory=update_memory,
+                llm_cache=llm_cache,
+                concurrent=True,
+                fused_mode=fused_mode,
+                distributed=distributed,
+                result_cache=result_cache,
+                on_summary_token=on_summary_token,
+                min_chars_for_llm=min_chars_for_llm,
+            )
+        )
 
-    # ---- 1. Build Tools container ----
+    cache_key, call_state = _cached_result(
+        raw_transcript, llm_client, result_cache, fused_mode, distributed, min_chars_for_llm
+    )
+    if call_state is None:
+        tools = default_tools(
+            llm_client=llm_client,
+            cleaner=cleaner,
+            data_loader=data_loader,
+            llm_cache=llm_cache,
+            fused_mode=fused_mode,
+            distributed=distributed,
+            on_summary_token=on_summary_token,
+            min_chars_for_llm=min_chars_for_llm,
+        )
+        call_state = _run_sequential(CallState(raw_transcript=raw_transcript), tools)
+        _store_result(result_cache, cache_key, call_state)
+
+    if update_memory:
+        _enqueue_memory_update(call_state)
+    return call_state
+
+
+async def run_pipeline_async(
+    raw_transcript: str,
+    llm_client,
+    cleaner=None,
+    data_loader=None,
+    update_memory: bool = True,
+    llm_cache: Optional[SemanticCache] = None,
+    concurrent: bool = True,
+    fused_mode: bool = False,
+    distributed: bool = False,
+    result_cache: Optional[ResultCache] = None,
+    on_summary_token: Optional[Callable[[str], None]] = None,
+    min_chars_for_llm: int = MIN_LLM_CHARS,
+) -> CallState:
+    """
+    Async version of run_pipeline (same arguments and result).
+
+    Agents make blocking LLM calls, so each one runs in a worker thread;
+    with `concurrent`, the agents of a stage run at the same time and a
+    stage costs about one LLM round-trip.
+    """
+
+    # ---- 0. Replayed transcript? Skip every agent ----
+    cache_key, call_state = _cached_result(
+        raw_transcript, llm_client, result_cache, fused_mode, distributed, min_chars_for_llm
+    )
+
+    if call_state is None:
+        # ---- 1. Build Tools container ----
+        tools = default_tools(
+            llm_client=llm_client,
+            cleaner=cleaner,
+            data_loader=data_loader,
+            llm_cache=llm_cache,
+            fused_mode=fused_mode,
+            distributed=distributed,
+            on_summary_token=on_summary_token,
+            min_chars_for_llm=min_chars_for_llm,
+        )
+
+        # ---- 2. Initialize per-call state ----
+        call_state = CallState(raw_transcript=raw_transcript)
+
+        # ---- 3. Execute agents: dependency stages (A2A-supported) ----
+        # ---- 4. Evaluation agent (if registered) ----
+        if concurrent:
+            call_state = await run_stages_async(call_state, tools)
+            call_state = await asyncio.to_thread(_evaluate, call_state, tools)
+        else:
+            call_state = await asyncio.to_thread(_run_sequential, call_state, tools)
+
+        _store_result(result_cache, cache_key, call_state)
+
+    # ---- 5. Update long-term memory (in the background) ----
+    if update_memory:
+        _enqueue_memory_update(call_state)
+
+    # ---- 6. Return to UI ----
+    return call_state
+
+
+def _run_coroutine(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    asyncio.run(coro), also from a thread whose event loop is already
+    running: the coroutine then gets a fresh loop on a worker thread and
+    the caller blocks until it is done.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _cached_result(
+    raw_transcript: str,
+    llm_client,
+    result_cache: Optional[ResultCache],
+    fused_mode: bool,
+    distributed: bool,
+    min_chars_for_llm: int,
+) -> Tuple[Optional[str], Optional[CallState]]:
+    """
+    (result cache key, cached CallState); both None when not caching.
+    """
+    if result_cache is None or llm_client is None:
+        return None, None
+    cache_key = ResultCache.key(
+        raw_transcript,
+        variant=(
+            f"fused={fused_mode}|fused_analysis={USE_FUSED}"
+            f"|distributed={distributed}|min_chars={min_chars_for_llm}"
+            f"|models={DEFAULT_MODEL},{FAST_MODEL},{FAST_MODEL_MAX_CHARS}"
+        ),
+    )
+    return cache_key, result_cache.get(cache_key)
+
+
+def _store_result(
+    result_cache: Optional[ResultCache],
+    cache_key: Optional[str],
+    call_state: CallState,
+) -> None:
+    # Only a fully LLM-answered result is worth replaying; one that
+    # fell back to rules during an outage would otherwise stick.
+    if cache_key is not None and _fully_answered(call_state):
+        result_cache.set(cache_key, call_state)
+
+
+def _evaluate(call_state: CallState, tools: Tools) -> CallState:
+    if "evaluation" not in AGENT_MODULES:
+        return call_state
+    return get_agent("evaluation")(call_state, tools=tools)
+
+
+def _run_sequential(call_state: CallState, tools: Tools) -> CallState:
+    """
+    AGENT_EXECUTION_ORDER then evaluation, one agent at a time.
+    """
+    for agent_name in AGENT_EXECUTION_ORDER:
+        call_state = get_agent(agent_name)(call_state, tools=tools)
+    return _evaluate(call_state, tools)
+
+
+# ---------------- batch analysis ---------------- #
+
+#: Agents with a batched variant run once per batch, the rest once per call.
+_PER_CALL_AGENTS = ["cleaning", "entities", "frustration_loop"]
+# each batched agent writes every state's counters, so they run in turn
+_BATCHED_AGENTS = ["summarization", "sentiment", "pain_points", "actions"]
+
+
+def run_pipeline_batch(
+    transcripts: List[str],
+    llm_client,
+    cleaner=None,
+    data_loader=None,
+    update_memory: bool = True,
+    llm_cache: Optional[SemanticCache] = None,
+    distributed: bool = False,
+    min_chars_for_llm: int = MIN_LLM_CHARS,
+) -> List[CallState]:
+    """
+    Analyze many transcripts (e.g. all CSV rows) at once.
+
+    Cleaning, entities and frustration run per call (calls in parallel);
+    summarization, sentiment, pain points and actions use their batched
+    variants, which pack several calls into each LLM request.
+
+    Like run_pipeline, it also works while an event loop is running.
+    """
+    return _run_coroutine(
+        run_pipeline_batch_async(
+            transcripts,
+            llm_client,
+            cleaner=cleaner,
+            data_loader=data_loader,
+            update_memory=update_memory,
+            llm_cache=llm_cache,
+            distributed=distributed,
+            min_chars_for_llm=min_chars_for_llm,
+        )
+    )
+
+
+async def run_pipeline_batch_async(
+    transcripts: List[str],
+    llm_client,
+    cleaner=None,
+    data_loader=None,
+    update_memory: bool = True,
+    llm_cache: Optional[SemanticCache] = None,
+    distributed: bool = False,
+    min_chars_for_llm: int = MIN_LLM_CHARS,
+) -> List[CallState]:
+    """
+    Async version of run_pipeline_batch (same arguments and result).
+    """
     tools = default_tools(
         llm_client=llm_client,
         cleaner=cleaner,
         data_loader=data_loader,
+        llm_cache=llm_cache,
+        distributed=distributed,
+        min_chars_for_llm=min_chars_for_llm,
     )
+    call_states = [CallState(raw_transcript=t) for t in transcripts]
 
-    # ---- 2. Initialize per-call state ----
-    call_state = CallState(raw_transcript=raw_transcript)
+    async def per_call(agent_names: List[str]) -> None:
+        def run(call_state: CallState) -> CallState:
+            for agent_name in agent_names:
+                call_state = get_agent(agent_name)(call_state, tools=tools)
+            return call_state
 
-    # ---- 3. Execute agents in the canonical order (A2A-supported) ----
-    for agent_name in AGENT_EXECUTION_ORDER:
-        agent_fn = get_agent(agent_name)
-        call_state = agent_fn(call_state, tools=tools)
+        call_states[:] = await asyncio.gather(
+            *(asyncio.to_thread(run, cs) for cs in call_states)
+        )
 
-    # ---- 4. Evaluation agent (optional if registered separately) ----
-    # If evaluation agent is in registry, you can include it there.
-    # Otherwise, you can call it manually here.
-    try:
-        eval_fn = get_agent("evaluation")
-        call_state = eval_fn(call_state, tools=tools)
-    except KeyError:
-        # evaluation not registered, skip
-        pass
+    await per_call(_PER_CALL_AGENTS)
+
+    for agent_name in _BATCHED_AGENTS:
+        batch_fn = get_batch_agent(agent_name)
+        await asyncio.to_thread(batch_fn, call_states, tools=tools)
+
+    if "evaluation" in AGENT_MODULES:
+        await per_call(["evaluation"])
 
-    # ---- 5. Update long-term memory ----
     if update_memory:
-        from eval.metrics import update_memory_from_call
-        update_memory_from_call(GLOBAL_MEMORY, call_state)
+        for call_state in call_states:
+            _enqueue_memory_update(call_state)
 
-    # ---- 6. Return to UI ----
-    return call_state
+    return call_states
@@ -0,0 +1,119 @@
+# graph/throttle.py
+
+"""
+Client-side rate limiting for LLM calls.
+
+ThrottledLLM keeps the pipeline under the account's rate limits before the
+API has to reject anything:
+- at most `max_concurrency` requests are in flight at once
+- a request-per-minute bucket (rpm) and a token-per-minute bucket (tpm)
+  make callers wait when the next request would exceed either limit
+
+Agents run in worker threads (see agents/pipeline.py), so the limiter is
+thread-based. Reactive retries on 429s are still handled by RetryingLLM
+(graph/retry.py), which sits outside this wrapper so every retry waits for
+the limiter again.
+"""
+
+from __future__ import annotations
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+import threading
+import time
+
+
+# Defaults sized for gpt-4o-mini on a low usage tier.
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200_000
+
+#: Completion budget assumed when a request sets no max_tokens.
+DEFAULT_COMPLETION_TOKENS = 512
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket holding up to `capacity` tokens, refilled
+    continuously at `capacity / period` tokens per second.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take `amount` tokens, blocking until they are available.
+        Returns the number of seconds spent waiting.
+        """
+        # a single oversized request must still be able to go through
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+def estimate_request_tokens(kwargs: dict) -> int:
+    """
+    Rough token cost of a chat request: ~4 characters per prompt token,
+    plus the completion budget.
+    """
+    prompt_chars = sum(len(m.get("content") or "") for m in kwargs.get("messages", []))
+    completion = kwargs.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt_chars // 4 + completion
+
+
+class ThrottledLLM:
+    """
+    Drop-in wrapper that rate-limits `chat.completions.create`; every other
+    attribute is forwarded to the wrapped client.
+
+    Pass rpm/tpm=None to disable that bucket.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rpm: Optional[int] = DEFAULT_RPM,
+        tpm: Optional[int] = DEFAULT_TPM,
+    ) -> None:
+        self.llm = llm
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._requests = TokenBucket(rpm) if rpm else None
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _create(self, **kwargs: Any) -> Any:
+        if self._requests is not None:
+            self._requests.acquire(1)
+        if self._tokens is not None:
+            self._tokens.acquire(estimate_request_tokens(kwargs))
+        # For stream=True the slot is released once the stream is opened.
+        with self._slots:
+            return self.llm.chat.completions.create(**kwargs)
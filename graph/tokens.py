@@ -0,0 +1,83 @@
+# graph/tokens.py
+
+"""
+Token counting and truncation for prompt budgets.
+
+Uses tiktoken (the model's real tokenizer) when it is installed and falls
+back to ~4 characters per token otherwise, which is close enough for
+enforcing a budget.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency, fall back to a character estimate
+    tiktoken = None
+
+
+TOKENIZER_MODEL = "gpt-4o-mini"
+
+#: Characters per token assumed without tiktoken.
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> Optional[Any]:
+    """
+    The tiktoken encoding for TOKENIZER_MODEL, built once (None without tiktoken).
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+    except KeyError:  # older tiktoken without this model
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str) -> int:
+    enc = get_encoding()
+    if enc is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(enc.encode(text))
+
+
+def split_tokens(text: str, max_tokens: int) -> List[str]:
+    """
+    Split `text` into consecutive pieces of at most `max_tokens` tokens.
+    """
+    # every token covers at least one character
+    if len(text) <= max_tokens:
+        return [text]
+
+    enc = get_encoding()
+    if enc is None:
+        step = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + step] for i in range(0, len(text), step)]
+
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    return [
+        enc.decode(tokens[i:i + max_tokens])
+        for i in range(0, len(tokens), max_tokens)
+    ]
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    The first `max_tokens` tokens of `text`.
+    """
+    if len(text) <= max_tokens:
+        return text
+
+    enc = get_encoding()
+    if enc is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
@@ -8,11 +8,17 @@ This includes:
 - OpenAI LLM client
 - MCP transcript cleaning tool (optional)
 - Data loader for CSV/dataset (optional)
+- Semantic LLM response cache (optional)
 """
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Optional, Protocol
+from typing import Any, Callable, Optional, Protocol
+import os
+
+from graph.llm_cache import CachedLLM, SemanticCache
+from graph.retry import RetryingLLM
+from graph.throttle import ThrottledLLM
 
 
 # ---------- Protocols (interfaces) ---------- #
@@ -27,6 +33,51 @@ class DataLoader(Protocol):
         ...
 
 
+# ---------- LLM gating ---------- #
+
+#: Transcripts below either limit carry too little signal to be worth an
+#: LLM round-trip; agents go straight to their rule-based fallback.
+#: The character limit is configurable per Tools bundle (min_chars_for_llm).
+MIN_LLM_CHARS = 50
+MIN_LLM_WORDS = 10
+
+
+def is_trivial_text(text: str, min_chars: int = MIN_LLM_CHARS) -> bool:
+    """
+    True if `text` is too short for an LLM call to be worthwhile.
+    """
+    stripped = (text or "").strip()
+    if len(stripped) < min_chars:
+        return True
+    return len(stripped.split(maxsplit=MIN_LLM_WORDS)) < MIN_LLM_WORDS
+
+
+# ---------- Model tiers ---------- #
+
+#: Model for everything not routed to the fast tier.
+DEFAULT_MODEL = os.getenv("CALLSENSE_MODEL", "gpt-4o-mini")
+#: Smaller, cheaper model for low-stakes tasks and short transcripts.
+FAST_MODEL = os.getenv("CALLSENSE_FAST_MODEL", "gpt-4.1-nano")
+#: Length-routed tasks use FAST_MODEL up to this many characters of input.
+FAST_MODEL_MAX_CHARS = int(os.getenv("CALLSENSE_FAST_MODEL_MAX_CHARS", "2000"))
+
+#: Tasks that always use the fast tier (a one-word label).
+FAST_TASKS = frozenset({"sentiment"})
+#: Tasks that use the fast tier for short input only.
+LENGTH_ROUTED_TASKS = frozenset({"summarize"})
+
+
+def choose_model(task: str, char_len: int = 0) -> str:
+    """
+    Model to use for `task` on an input of `char_len` characters.
+    """
+    if task in FAST_TASKS:
+        return FAST_MODEL
+    if task in LENGTH_ROUTED_TASKS and char_len <= FAST_MODEL_MAX_CHARS:
+        return FAST_MODEL
+    return DEFAULT_MODEL
+
+
 # ---------- Tools container ---------- #
 
 @dataclass
@@ -37,14 +88,37 @@ class Tools:
     llm:    OpenAI (or compatible) client
     cleaner: transcript cleaning tool (MCP or custom) – optional
     data_loader: loader for your CSV or dataset – optional
+    fused_mode: sentiment + frustration share one LLM call (emotion agent)
+    distributed: A2A messages also go out as full envelopes (state.messages)
+    cache: prompt → completion cache the LLM client reads through – optional
+    on_summary_token: called with each summary text delta as it streams – optional
+    min_chars_for_llm: shorter transcripts skip the LLM (rule-based path)
     """
     llm: Any
     cleaner: Optional[TranscriptCleaner] = None
     data_loader: Optional[DataLoader] = None
+    fused_mode: bool = False
+    distributed: bool = False
+    cache: Optional[SemanticCache] = None
+    on_summary_token: Optional[Callable[[str], None]] = None
+    min_chars_for_llm: int = MIN_LLM_CHARS
 
     def get_llm(self) -> Any:
         return self.llm
 
+    def is_trivial(self, text: str, min_chars: int = 0) -> bool:
+        """
+        is_trivial_text with this bundle's threshold; an agent may pass a
+        stricter `min_chars` of its own.
+        """
+        return is_trivial_text(text, max(self.min_chars_for_llm, min_chars))
+
+    def choose_model(self, task: str, char_len: int = 0) -> str:
+        return choose_model(task, char_len)
+
+    def get_cache(self) -> Optional[SemanticCache]:
+        return self.cache
+
     def get_cleaner(self) -> Optional[TranscriptCleaner]:
         return self.cleaner
 
@@ -56,12 +130,36 @@ def default_tools(
     llm_client: Any,
     cleaner: Optional[TranscriptCleaner] = None,
     data_loader: Optional[DataLoader] = None,
+    llm_cache: Optional[SemanticCache] = None,
+    fused_mode: bool = False,
+    distributed: bool = False,
+    on_summary_token: Optional[Callable[[str], None]] = None,
+    min_chars_for_llm: int = MIN_LLM_CHARS,
 ) -> Tools:
     """
     Convenience factory for building the Tools bundle.
+
+    The LLM client is wrapped, innermost first, in:
+    - ThrottledLLM: concurrency / RPM / TPM limits (skipped if the client
+      already is one, so a limiter can be shared across pipeline runs)
+    - RetryingLLM: transient errors are retried with backoff
+    - CachedLLM, if `llm_cache` is given: repeated (or near-identical)
+      prompts are served from the cache without touching the network
     """
+    if llm_client is not None:
+        if not isinstance(llm_client, ThrottledLLM):
+            llm_client = ThrottledLLM(llm_client)
+        llm_client = RetryingLLM(llm_client)
+        if llm_cache is not None:
+            llm_client = CachedLLM(llm_client, llm_cache)
+
     return Tools(
         llm=llm_client,
         cleaner=cleaner,
         data_loader=data_loader,
+        fused_mode=fused_mode,
+        distributed=distributed,
+        cache=llm_cache,
+        on_summary_token=on_summary_token,
+        min_chars_for_llm=min_chars_for_llm,
     )
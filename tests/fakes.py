@@ -0,0 +1,96 @@
+# tests/fakes.py
+
+"""
+OpenAI-shaped fakes for the agent and cache tests (no network).
+"""
+
+from __future__ import annotations
+import json
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+def completion(text: str) -> Any:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text), finish_reason="stop")]
+    )
+
+
+def chunk(text: Optional[str], finish_reason: Optional[str] = None) -> Any:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=finish_reason)]
+    )
+
+
+def stream(
+    pieces: List[str],
+    finish_reason: Optional[str] = "stop",
+    error: Optional[BaseException] = None,
+) -> Iterator[Any]:
+    """
+    Chunks for `pieces`; raises `error` after them instead of finishing.
+    """
+    for piece in pieces:
+        yield chunk(piece)
+    if error is not None:
+        raise error
+    yield chunk(None, finish_reason)
+
+
+Reply = Union[str, BaseException, Callable[[Dict[str, Any]], Any]]
+
+
+class FakeLLM:
+    """
+    Records every chat.completions.create call and answers with `reply`:
+    a string (streamed word by word when stream=True), an exception to
+    raise, or a function of the request kwargs.
+    """
+
+    def __init__(self, reply: Reply = "ok") -> None:
+        self.reply = reply
+        self.calls: List[Dict[str, Any]] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs: Any) -> Any:
+        self.calls.append(kwargs)
+        reply = self.reply
+        if callable(reply) and not isinstance(reply, BaseException):
+            reply = reply(kwargs)
+        if isinstance(reply, BaseException):
+            raise reply
+        if not isinstance(reply, str):
+            return reply
+        if kwargs.get("stream"):
+            return stream([w + " " for w in reply.split()])
+        return completion(reply)
+
+    @staticmethod
+    def system_prompt(kwargs: Dict[str, Any]) -> str:
+        return kwargs["messages"][0]["content"]
+
+
+def analyst_reply(kwargs: Dict[str, Any]) -> str:
+    """
+    A well-formed answer for whichever CallSense agent sent the request.
+    """
+    system = FakeLLM.system_prompt(kwargs).lower()
+    if "evaluat" in system:
+        return json.dumps(
+            {"faithfulness_score": 0.9, "coverage_score": 0.8, "consistency_score": 0.7, "notes": "ok"}
+        )
+    if "frustration" in system and "sentiment" in system:
+        return json.dumps({"sentiment": "negative", "frustration": [{"index": 0, "level": "high"}]})
+    if "frustration" in system:
+        return json.dumps([{"index": 0, "utterance": "x", "level": "high"}])
+    if "summary" in system and "pain" in system:
+        return json.dumps({"summary": "Fused.", "sentiment": "negative", "pain_points": ["double fee"]})
+    if "sentiment" in system:
+        return "negative"
+    if "pain point" in system:
+        return json.dumps(["double fee", "repeated calls"])
+    if "action" in system:
+        return json.dumps(["Refund the duplicate fee"])
+    if "summar" in system:
+        return "The customer was charged twice and asked for a refund."
+    return json.dumps({"product": "credit card", "issue": "double fee", "priority": "high"})
@@ -0,0 +1,92 @@
+# tests/test_a2a.py
+
+import unittest
+
+from graph.a2a import ENVELOPE, get_messages_for_agent, send_message
+from graph.state import CallState
+from graph.supervisor import run_pipeline, run_pipeline_batch
+from tests.fakes import FakeLLM, analyst_reply
+from tests.test_pipeline import TRANSCRIPT
+
+
+def _send(state, msg_type, payload, transport="inproc", to_agent="actions"):
+    send_message(
+        state,
+        from_agent="test",
+        to_agent=to_agent,
+        msg_type=msg_type,
+        payload=payload,
+        transport=transport,
+    )
+
+
+class SendMessageTest(unittest.TestCase):
+    def test_typed_message_skips_the_log_in_process(self):
+        state = CallState()
+        _send(state, "sentiment_signal", {"sentiment": "negative"})
+        self.assertEqual(state.sentiment_signal, {"sentiment": "negative"})
+        self.assertEqual(state.messages, [])
+
+    def test_typed_message_is_also_logged_for_the_envelope_transport(self):
+        state = CallState()
+        _send(state, "frustration_summary", {"max_level": "high"}, transport=ENVELOPE)
+        self.assertEqual(state.frustration_summary, {"max_level": "high"})
+        self.assertEqual(len(state.messages), 1)
+
+    def test_type_named_like_another_field_is_only_logged(self):
+        state = CallState(summary="kept")
+        _send(state, "summary", {"text": "overwrite?"})
+        self.assertEqual(state.summary, "kept")
+        self.assertEqual(
+            [m["payload"] for m in get_messages_for_agent(state, agent_name="actions")],
+            [{"text": "overwrite?"}],
+        )
+
+
+class GetMessagesTest(unittest.TestCase):
+    def test_direct_and_broadcast_messages_keep_send_order(self):
+        state = CallState()
+        _send(state, "note", {"n": 1}, to_agent="any")
+        _send(state, "note", {"n": 2})
+        _send(state, "alert", {"n": 3}, to_agent="any")
+        _send(state, "note", {"n": 4}, to_agent="any")
+        _send(state, "note", {"n": 5}, to_agent="summarization")
+
+        def payloads(**kwargs):
+            return [m["payload"]["n"] for m in get_messages_for_agent(state, agent_name="actions", **kwargs)]
+
+        self.assertEqual(payloads(), [1, 2, 3, 4])
+        self.assertEqual(payloads(msg_type="note"), [1, 2, 4])
+        self.assertEqual(
+            [m["payload"]["n"] for m in get_messages_for_agent(state, agent_name="any")], [1, 3, 4]
+        )
+
+
+class DistributedPipelineTest(unittest.TestCase):
+    def _types(self, state, agent_name):
+        return [m["type"] for m in get_messages_for_agent(state, agent_name=agent_name)]
+
+    def test_envelopes_are_logged_only_when_distributed(self):
+        for concurrent in (True, False):
+            with self.subTest(concurrent=concurrent):
+                state = run_pipeline(
+                    TRANSCRIPT, FakeLLM(analyst_reply), update_memory=False,
+                    concurrent=concurrent, distributed=True,
+                )
+                self.assertEqual(self._types(state, "summarization"), ["entity_summary"])
+                self.assertEqual(self._types(state, "pain_points"), ["frustration_summary"])
+                self.assertEqual(self._types(state, "actions"), ["sentiment_signal"])
+                self.assertEqual(state.sentiment_signal, {"sentiment": "negative"})
+
+        state = run_pipeline(TRANSCRIPT, FakeLLM(analyst_reply), update_memory=False)
+        self.assertEqual(state.messages, [])
+
+    def test_batch_pipeline_forwards_distributed(self):
+        [state] = run_pipeline_batch(
+            [TRANSCRIPT], FakeLLM(analyst_reply), update_memory=False, distributed=True
+        )
+        self.assertEqual(self._types(state, "summarization"), ["entity_summary"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+# tests/test_batch.py
+
+import csv
+import json
+import os
+import re
+import unittest
+
+from agents._batch import _call_blocks, _chunks, _parse_results, run_batched
+from graph.retry import RETRYABLE_ERRORS
+from graph.state import CallState
+from graph.supervisor import run_pipeline, run_pipeline_batch
+from graph.tools import Tools
+from tests.fakes import FakeLLM, analyst_reply
+
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "call_recordings.csv")
+
+
+class ChunksTest(unittest.TestCase):
+    def test_split_by_count(self):
+        items = [(i, "x") for i in range(5)]
+        self.assertEqual(
+            [[i for i, _ in c] for c in _chunks(items, batch_size=2, max_chars=100)],
+            [[0, 1], [2, 3], [4]],
+        )
+
+    def test_split_by_size_keeps_oversized_call_alone(self):
+        items = [(0, "a" * 4), (1, "b" * 4), (2, "c" * 20), (3, "d")]
+        self.assertEqual(
+            [[i for i, _ in c] for c in _chunks(items, batch_size=10, max_chars=10)],
+            [[0, 1], [2], [3]],
+        )
+
+    def test_call_blocks(self):
+        self.assertEqual(
+            _call_blocks([(3, "hi"), (7, "bye")]),
+            "<CALL id=3>\nhi\n</CALL>\n\n<CALL id=7>\nbye\n</CALL>",
+        )
+
+
+class ParseResultsTest(unittest.TestCase):
+    def test_keyed_object_and_bare_list(self):
+        raw = '{"summaries": [{"id": 0, "text": "a"}, {"id": "2", "text": "b"}]}'
+        self.assertEqual(_parse_results(raw, "summaries", "text"), {0: "a", 2: "b"})
+        self.assertEqual(_parse_results('[{"id": 1, "text": "c"}]', "summaries", "text"), {1: "c"})
+
+    def test_malformed_items_are_skipped(self):
+        raw = '{"summaries": [1, {"id": 0}, {"id": null, "text": "x"}, {"id": 4, "text": "ok"}]}'
+        self.assertEqual(_parse_results(raw, "summaries", "text"), {4: "ok"})
+
+    def test_non_json_and_bad_ids_raise_value_error(self):
+        for raw in ("nothing", '[{"id": "one", "text": "x"}]'):
+            with self.subTest(raw=raw):
+                with self.assertRaises(ValueError):
+                    _parse_results(raw, "summaries", "text")
+
+
+def _echo(kwargs):
+    ids = re.findall(r"<CALL id=(\d+)>", kwargs["messages"][-1]["content"])
+    return json.dumps({"labels": [{"id": int(i), "label": f"L{i}"} for i in ids]})
+
+
+class RunBatchedTest(unittest.TestCase):
+    def _run(self, llm, states, **kwargs):
+        return run_batched(
+            states,
+            Tools(llm=llm),
+            task="sentiment",
+            system_prompt="Label each call.",
+            render=lambda cs: cs.raw_transcript,
+            result_key="labels",
+            value_key="label",
+            temperature=0.0,
+            **kwargs,
+        )
+
+    def test_results_map_back_to_call_states(self):
+        states = [CallState(raw_transcript=f"call {i}") for i in range(5)]
+        llm = FakeLLM(_echo)
+        results = self._run(llm, states, batch_size=2, include=lambda cs: cs.raw_transcript != "call 1")
+
+        self.assertEqual(results, {0: "L0", 2: "L2", 3: "L3", 4: "L4"})
+        self.assertEqual(len(llm.calls), 2)
+        self.assertEqual([cs.llm_skipped for cs in states], [0, 1, 0, 0, 0])
+        self.assertEqual([cs.tool_calls for cs in states], [1, 0, 1, 1, 1])
+
+    def test_dropped_and_invented_ids(self):
+        states = [CallState(raw_transcript=f"call {i}") for i in range(3)]
+        llm = FakeLLM('{"labels": [{"id": 0, "label": "L0"}, {"id": 9, "label": "?"}]}')
+        self.assertEqual(self._run(llm, states), {0: "L0"})
+        self.assertEqual([cs.llm_fallbacks for cs in states], [0, 1, 1])
+
+    def test_failed_request_leaves_its_calls_to_the_fallback(self):
+        states = [CallState(raw_transcript=f"call {i}") for i in range(2)]
+        self.assertEqual(self._run(FakeLLM(RETRYABLE_ERRORS[0]("down")), states), {})
+        self.assertEqual([(cs.tool_calls, cs.tool_successes) for cs in states], [(1, 0), (1, 0)])
+
+
+class SampleRequestCountTest(unittest.TestCase):
+    def test_batched_agents_share_requests_on_the_sample(self):
+        with open(SAMPLE_CSV, encoding="utf-8", newline="") as f:
+            transcripts = [row["Transcript"] for row in csv.DictReader(f)]
+        self.assertEqual(len(transcripts), 20)
+
+        batched, per_call = FakeLLM(analyst_reply), FakeLLM(analyst_reply)
+        run_pipeline_batch(transcripts, batched, update_memory=False)
+        for transcript in transcripts:
+            run_pipeline(transcript, per_call, update_memory=False)
+
+        # entities, frustration and evaluation still run per call (3 x 20);
+        # summaries, sentiment, pain points and actions take 3 requests each
+        self.assertEqual(len(per_call.calls), 140)
+        self.assertEqual(len(batched.calls), 60 + 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+# tests/test_emotion.py
+
+import unittest
+
+from agents.frustration_loop import frustration_loop_agent
+from agents.sentiment import sentiment_agent
+from graph.state import CallState
+from graph.supervisor import run_pipeline
+from graph.tools import Tools
+from tests.fakes import FakeLLM, analyst_reply
+from tests.test_pipeline import TRANSCRIPT
+
+
+def _emotion_calls(llm):
+    return [kw for kw in llm.calls if "customer emotion" in FakeLLM.system_prompt(kw)]
+
+
+class FusedModeTest(unittest.TestCase):
+    def test_emotion_runs_once_per_call(self):
+        for concurrent in (True, False):
+            with self.subTest(concurrent=concurrent):
+                llm = FakeLLM(analyst_reply)
+                state = run_pipeline(
+                    TRANSCRIPT, llm, update_memory=False, fused_mode=True, concurrent=concurrent
+                )
+                self.assertEqual(len(_emotion_calls(llm)), 1)
+                self.assertEqual(state.sentiment, "negative")
+
+    def test_empty_timeline_does_not_rerun_emotion(self):
+        tools = Tools(llm=FakeLLM(analyst_reply), fused_mode=True)
+        state = frustration_loop_agent(CallState(), tools)
+        self.assertEqual(state.frustration_timeline, [])
+        steps = state.step_count
+
+        state = sentiment_agent(frustration_loop_agent(state, tools), tools)
+        self.assertEqual(state.step_count, steps)
+
+    def test_summary_block_only_when_there_is_a_summary(self):
+        llm = FakeLLM(analyst_reply)
+        tools = Tools(llm=llm, fused_mode=True, min_chars_for_llm=0)
+        frustration_loop_agent(CallState(cleaned_transcript=TRANSCRIPT), tools)
+        frustration_loop_agent(CallState(cleaned_transcript=TRANSCRIPT, summary="Refund."), tools)
+
+        prompts = [kw["messages"][-1]["content"] for kw in _emotion_calls(llm)]
+        self.assertNotIn("Summary:", prompts[0])
+        self.assertIn('Summary:\n"""Refund."""', prompts[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_json_utils.py
+
+import time
+import unittest
+
+from graph import json_utils
+from graph.json_utils import JSONDecodeError, loads_lenient
+
+
+class LoadsLenientTest(unittest.TestCase):
+    def test_plain_json(self):
+        self.assertEqual(loads_lenient(' {"a": 1} '), {"a": 1})
+
+    def test_markdown_fence(self):
+        self.assertEqual(loads_lenient('```json\n["x", "y"]\n```'), ["x", "y"])
+
+    def test_json_embedded_in_prose(self):
+        text = 'Sure! Here is the result: {"sentiment": "negative"} Hope this helps.'
+        self.assertEqual(loads_lenient(text), {"sentiment": "negative"})
+
+    def test_brackets_inside_strings_are_ignored(self):
+        text = 'Answer: {"note": "see [1] and {x}", "ok": true} done'
+        self.assertEqual(loads_lenient(text), {"note": "see [1] and {x}", "ok": True})
+
+    def test_skips_a_broken_block_before_a_valid_one(self):
+        text = "[not json] then {\"a\": [1, 2]}"
+        self.assertEqual(loads_lenient(text), {"a": [1, 2]})
+
+    def test_no_json_raises(self):
+        for text in ("", "no json here", "{unclosed", "[1, 2"):
+            with self.subTest(text=text):
+                with self.assertRaises(JSONDecodeError):
+                    loads_lenient(text)
+
+    def test_truncated_object_is_rejected(self):
+        text = '{"product": "credit card", "other_tags": ["fee", "refund"], "iss'
+        with self.assertRaises(JSONDecodeError):
+            loads_lenient(text)
+
+    def test_truncated_array_is_rejected(self):
+        text = '[{"index": 1, "level": "high"}, {"index": 2, "lev'
+        with self.assertRaises(JSONDecodeError):
+            loads_lenient(text)
+
+    def test_unclosed_brackets_fail_fast(self):
+        start = time.perf_counter()
+        with self.assertRaises(JSONDecodeError):
+            loads_lenient("[" * 20000)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_decode_error_is_a_value_error(self):
+        # agents catch parse failures as ValueError (graph.retry.PARSE_ERRORS)
+        self.assertTrue(issubclass(JSONDecodeError, ValueError))
+
+
+class DumpsCompactTest(unittest.TestCase):
+    def test_round_trip_without_whitespace(self):
+        obj = {"product": "card", "tags": ["fee", "refund"], "n": 2}
+        text = json_utils.dumps_compact(obj)
+        self.assertNotIn(" ", text)
+        self.assertEqual(json_utils.loads(text), obj)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# tests/test_keywords.py
+
+import unittest
+from unittest import mock
+
+from agents import _keywords
+from agents._keywords import KeywordMatcher
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    GROUPS = {"issue": ["fee", "fees", "refund"], "tone": ["not happy", "not", "happy"]}
+
+    def _matchers(self):
+        """The regex fallback, plus Aho-Corasick when it is installed."""
+        with mock.patch.object(_keywords, "ahocorasick", None):
+            yield "regex", KeywordMatcher(self.GROUPS)
+        if _keywords.ahocorasick is not None:
+            yield "ahocorasick", KeywordMatcher(self.GROUPS)
+
+    def test_same_results_as_substring_checks(self):
+        text = "i am not happy about the fees and want a refund"
+        expected = {
+            name: {kw for kw in keywords if kw in text} for name, keywords in self.GROUPS.items()
+        }
+        for backend, matcher in self._matchers():
+            with self.subTest(backend=backend):
+                self.assertEqual(matcher.found(text), expected)
+
+    def test_prefix_overlap(self):
+        for backend, matcher in self._matchers():
+            with self.subTest(backend=backend):
+                self.assertEqual(matcher.found("the fees")["issue"], {"fee", "fees"})
+                self.assertEqual(
+                    sorted((kw, start) for group, kw, start in matcher.iter_matches("the fees")),
+                    [("fee", 4), ("fees", 4)],
+                )
+
+    def test_first_follows_list_order(self):
+        for backend, matcher in self._matchers():
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    matcher.first("happy? not really"), {"issue": None, "tone": "not"}
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
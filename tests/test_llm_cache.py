@@ -0,0 +1,123 @@
+# tests/test_llm_cache.py
+
+import unittest
+
+from graph.llm_cache import CachedLLM, SemanticCache, _namespace
+from tests.fakes import FakeLLM, stream
+
+
+def _request(prompt: str = "hello", **kwargs):
+    return dict(
+        model="m",
+        messages=[{"role": "system", "content": "sys"}, {"role": "user", "content": prompt}],
+        **kwargs,
+    )
+
+
+def _read(s) -> str:
+    return "".join(c.choices[0].delta.content or "" for c in s if c.choices)
+
+
+class StreamRecordingTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(":memory:")
+
+    def test_completed_stream_is_recorded_and_replayed(self):
+        llm = FakeLLM(lambda kw: stream(["The ", "customer"]))
+        cached = CachedLLM(llm, self.cache)
+
+        self.assertEqual(_read(cached.chat.completions.create(**_request(stream=True))), "The customer")
+        self.assertEqual(_read(cached.chat.completions.create(**_request(stream=True))), "The customer")
+        self.assertEqual(len(llm.calls), 1)
+
+    def test_stream_failing_midway_is_not_recorded(self):
+        llm = FakeLLM(lambda kw: stream(["The ", "customer "], error=ConnectionResetError()))
+        cached = CachedLLM(llm, self.cache)
+
+        s = cached.chat.completions.create(**_request(stream=True))
+        with self.assertRaises(ConnectionResetError):
+            _read(s)
+        s.close()  # callers close in a finally block
+
+        self.assertIsNone(self.cache.get(*self._key()))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_stream_cut_off_by_length_is_not_recorded(self):
+        llm = FakeLLM(lambda kw: stream(["The ", "cust"], finish_reason="length"))
+        cached = CachedLLM(llm, self.cache)
+
+        _read(cached.chat.completions.create(**_request(stream=True)))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_deliberate_early_close_is_recorded(self):
+        llm = FakeLLM(lambda kw: stream(["negative ", "because ", "..."]))
+        cached = CachedLLM(llm, self.cache)
+
+        s = cached.chat.completions.create(**_request(stream=True))
+        for c in s:
+            break
+        s.close()
+
+        replay = cached.chat.completions.create(**_request(stream=True))
+        self.assertEqual(_read(replay), "negative ")
+        self.assertEqual(len(llm.calls), 1)
+
+    def _key(self):
+        return _namespace(_request(stream=True), "sys"), "hello"
+
+
+def _letters(text: str):
+    return [text.count(c) for c in "abcdefghijklmnopqrstuvwxyz"]
+
+
+class SemanticLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(":memory:", embed_fn=_letters, max_entries=10)
+
+    def _set(self, prompt, content, namespace="ns"):
+        self.cache.set(namespace, prompt, content, self.cache.embed(prompt))
+
+    def _similar(self, prompt, namespace="ns"):
+        return self.cache.get_similar(namespace, self.cache.embed(prompt))
+
+    def test_nearest_entry_above_threshold_wins(self):
+        self._set("charged twice for the card fee", "fee")
+        self._set("the package never arrived at my house", "delivery")
+
+        self.assertEqual(self._similar("charged twice for the card fees"), "fee")
+        self.assertIsNone(self._similar("zzz"))
+        self.assertIsNone(self._similar("charged twice for the card fees", namespace="other"))
+
+    def test_full_cache_evicts_a_batch_and_keeps_other_vectors(self):
+        for i in range(10):
+            self._set(f"prompt {i} " + "x" * i, f"answer {i}")
+        self.assertEqual(self._similar("prompt 9 " + "x" * 9), "answer 9")  # loads the index
+
+        self._set("prompt 10 " + "x" * 10, "answer 10")
+
+        self.assertEqual(len(self.cache), 9)  # down to 90% of max_entries
+        self.assertEqual(len(self.cache._vectors["ns"]), 9)
+        self.assertIsNone(self.cache.get("ns", "prompt 0 "))
+        self.assertEqual(self._similar("prompt 10 " + "x" * 10), "answer 10")
+        self.assertEqual(self._similar("prompt 5 " + "x" * 5), "answer 5")
+
+        self._set("prompt 11 " + "x" * 11, "answer 11")
+        self.assertEqual(len(self.cache), 10)  # no eviction until full again
+
+
+class RecencyTest(unittest.TestCase):
+    def test_in_process_hit_protects_entry_from_eviction(self):
+        cache = SemanticCache(":memory:", max_entries=4)
+        for i in range(4):
+            cache.set("ns", f"p{i}", f"a{i}")
+        self.assertEqual(cache.get("ns", "p0"), "a0")  # served by the in-process LRU
+
+        cache.set("ns", "p4", "a4")
+
+        cache._memory.clear()
+        self.assertEqual(cache.get("ns", "p0"), "a0")
+        self.assertIsNone(cache.get("ns", "p1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+# tests/test_memory.py
+
+import os
+import queue
+import tempfile
+import unittest
+from unittest import mock
+
+from graph import supervisor
+from graph.state import CallState, MemoryState
+
+
+class MemoryPersistenceTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "memory.json")
+
+        saved = MemoryState(total_calls=7)
+        saved.sentiment_counts["negative"] = 7
+        saved.save(self.path)
+
+        for name, value in (
+            ("MEMORY_PATH", self.path),
+            ("GLOBAL_MEMORY", MemoryState()),
+            ("_memory_loaded", False),
+            ("_unsaved_calls", 0),
+            ("_mem_queue", queue.Queue()),
+            ("_mem_worker", None),
+        ):
+            patcher = mock.patch.object(supervisor, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unloaded_memory_never_overwrites_the_file(self):
+        supervisor.save_memory()
+        self.assertEqual(MemoryState.load(self.path).total_calls, 7)
+
+    def test_queued_updates_are_saved_at_exit(self):
+        supervisor._enqueue_memory_update(CallState(sentiment="positive"))
+        supervisor._save_memory_at_exit()
+
+        memory = MemoryState.load(self.path)
+        self.assertEqual(memory.total_calls, 8)
+        self.assertEqual(memory.sentiment_counts, {"negative": 7, "positive": 1})
+
+    def test_flush_gives_up_after_timeout(self):
+        supervisor._mem_queue.put(CallState())  # no worker to take it
+        self.assertFalse(supervisor.flush_memory_updates(timeout=0.01))
+
+    def test_wrongly_shaped_file_gives_empty_memory(self):
+        for content in (
+            '{"sentiment_counts": 5}',
+            '{"pain_point_counts": {"fees": "many"}}',
+            '{"total_calls": "7"}',
+            '{"avg_coverage": [0.5]}',
+        ):
+            with self.subTest(content=content):
+                with open(self.path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                self.assertEqual(MemoryState.load(self.path), MemoryState())
+
+                supervisor._memory_loaded = False
+                self.assertEqual(supervisor.load_memory(), MemoryState())
+
+    def test_repo_root_is_the_checkout(self):
+        self.assertTrue(os.path.isfile(os.path.join(supervisor._REPO_ROOT, "graph", "supervisor.py")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# tests/test_pipeline.py
+
+import asyncio
+import unittest
+
+from agents.pipeline import _branch, _merge
+from graph.a2a import get_messages_for_agent, send_message
+from graph.state import CallState
+from graph.supervisor import run_pipeline, run_pipeline_async, run_pipeline_batch
+from tests.fakes import FakeLLM, analyst_reply
+
+
+TRANSCRIPT = (
+    "Customer: I was charged a fee twice on my credit card and I want a refund. "
+    "This is the third time I am calling about it. Agent: I am sorry, let me check "
+    "the account. Customer: I already waited two weeks and nobody called me back, "
+    "this is really frustrating."
+)
+
+
+def _note(state: CallState, sender: str) -> None:
+    send_message(state, from_agent=sender, to_agent="actions", msg_type="note", payload={"by": sender})
+
+
+class BranchMergeTest(unittest.TestCase):
+    def setUp(self):
+        self.state = CallState(raw_transcript="x", pain_points=["a"], tool_calls=1)
+        _note(self.state, "cleaning")
+
+    def test_branch_mutations_do_not_leak(self):
+        branch = _branch(self.state)
+        branch.pain_points.append("b")
+        branch.entities["product"] = "card"
+        _note(branch, "entities")
+
+        self.assertEqual(self.state.pain_points, ["a"])
+        self.assertEqual(self.state.entities, {})
+        self.assertEqual(len(self.state.messages), 1)
+        self.assertEqual(len(get_messages_for_agent(self.state, agent_name="actions")), 1)
+
+    def test_merge_copies_fields_sums_counters_and_appends_messages(self):
+        first, second = _branch(self.state), _branch(self.state)
+        first.entities = {"product": "card"}
+        first.tool_calls += 1
+        first.tool_successes += 1
+        _note(first, "entities")
+        second.sentiment = "negative"
+        second.tool_calls += 2
+        second.llm_fallbacks += 1
+        _note(second, "sentiment")
+
+        merged = _merge(self.state, [first, second])
+
+        self.assertEqual(merged.entities, {"product": "card"})
+        self.assertEqual(merged.sentiment, "negative")
+        self.assertEqual((merged.tool_calls, merged.tool_successes, merged.llm_fallbacks), (4, 1, 1))
+        senders = [m["from"] for m in get_messages_for_agent(merged, agent_name="actions")]
+        self.assertEqual(senders, ["cleaning", "entities", "sentiment"])
+
+
+class RunPipelineTest(unittest.TestCase):
+    def test_concurrent_and_sequential_agree(self):
+        concurrent = run_pipeline(TRANSCRIPT, FakeLLM(analyst_reply), update_memory=False)
+        sequential = run_pipeline(
+            TRANSCRIPT, FakeLLM(analyst_reply), update_memory=False, concurrent=False
+        )
+        for name in ("summary", "sentiment", "pain_points", "recommended_actions", "entities"):
+            self.assertEqual(getattr(concurrent, name), getattr(sequential, name), name)
+        self.assertEqual(concurrent.tool_calls, sequential.tool_calls)
+        self.assertTrue(sequential.evaluation)
+
+    def test_trivial_transcript_sends_no_llm_request(self):
+        for concurrent in (True, False):
+            with self.subTest(concurrent=concurrent):
+                llm = FakeLLM(analyst_reply)
+                state = run_pipeline("Customer: hi.", llm, update_memory=False, concurrent=concurrent)
+                self.assertEqual(llm.calls, [])
+                self.assertTrue(state.llm_skipped)
+                self.assertIn("faithfulness_score", state.evaluation)
+
+    def test_blocking_calls_work_inside_a_running_loop(self):
+        async def notebook_cell():
+            single = run_pipeline(TRANSCRIPT, FakeLLM(analyst_reply), update_memory=False)
+            sequential = run_pipeline(
+                TRANSCRIPT, FakeLLM(analyst_reply), update_memory=False, concurrent=False
+            )
+            batch = run_pipeline_batch([TRANSCRIPT], FakeLLM(analyst_reply), update_memory=False)
+            awaited = await run_pipeline_async(TRANSCRIPT, FakeLLM(analyst_reply), update_memory=False)
+            return single, sequential, batch, awaited
+
+        single, sequential, batch, awaited = asyncio.run(notebook_cell())
+        self.assertEqual(single.summary, awaited.summary)
+        self.assertEqual(sequential.summary, awaited.summary)
+        self.assertEqual(len(batch), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
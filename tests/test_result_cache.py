@@ -0,0 +1,73 @@
+# tests/test_result_cache.py
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from graph import supervisor
+from graph.result_cache import ResultCache
+from graph.retry import RETRYABLE_ERRORS
+from graph.supervisor import run_pipeline
+from tests.fakes import FakeLLM, analyst_reply
+
+
+TRANSCRIPT = (
+    "Customer: I was charged a fee twice on my credit card and I want a refund. "
+    "This is the third time I am calling about it. Agent: I am sorry, let me check "
+    "the account. Customer: I already waited two weeks and nobody called me back, "
+    "this is really frustrating."
+)
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ResultCache(tmp.name)
+
+    def _run(self, llm):
+        return run_pipeline(TRANSCRIPT, llm, update_memory=False, result_cache=self.cache)
+
+    def test_fully_answered_result_is_replayed(self):
+        llm = FakeLLM(analyst_reply)
+        first = self._run(llm)
+        n_calls = len(llm.calls)
+
+        second = self._run(llm)
+        self.assertEqual(len(llm.calls), n_calls)
+        self.assertEqual(second.summary, first.summary)
+
+    def test_outage_result_is_not_cached(self):
+        self._run(FakeLLM(RETRYABLE_ERRORS[0]("down")))
+
+        llm = FakeLLM(analyst_reply)
+        state = self._run(llm)
+        self.assertTrue(llm.calls)
+        self.assertEqual(state.summary, "The customer was charged twice and asked for a refund.")
+
+    def test_fallback_result_is_not_cached(self):
+        def reply(kwargs):
+            if "recommend concrete" in FakeLLM.system_prompt(kwargs).lower():
+                return "not json"
+            return analyst_reply(kwargs)
+
+        state = self._run(FakeLLM(reply))
+        self.assertEqual(state.tool_successes, state.tool_calls)
+        self.assertEqual(state.llm_fallbacks, 1)
+        self.assertEqual(len(list(self._entries())), 0)
+
+    def test_model_change_misses(self):
+        self._run(FakeLLM(analyst_reply))
+
+        llm = FakeLLM(analyst_reply)
+        with mock.patch.object(supervisor, "DEFAULT_MODEL", "another-model"):
+            self._run(llm)
+        self.assertTrue(llm.calls)
+
+    def _entries(self):
+        return (n for n in os.listdir(self.cache.directory) if n.endswith(".pkl"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+# tests/test_retry.py
+
+import unittest
+
+from agents.actions import actions_agent
+from agents.entities import entities_agent
+from agents.evaluation import evaluation_agent
+from agents.sentiment import sentiment_agent
+from agents.summarization import summarization_agent
+from graph.retry import RETRYABLE_ERRORS, STREAM_ERRORS, RetryingLLM, call_with_retry
+from graph.state import CallState
+from graph.tools import Tools
+from tests.fakes import FakeLLM, stream
+
+
+TRANSCRIPT = (
+    "Customer: I was charged a fee twice on my credit card and I want a refund. "
+    "This is the third time I am calling about it."
+)
+
+
+def _state() -> CallState:
+    return CallState(raw_transcript=TRANSCRIPT, cleaned_transcript=TRANSCRIPT)
+
+
+class CallWithRetryTest(unittest.TestCase):
+    def test_retries_transient_errors_then_succeeds(self):
+        attempts = []
+        sleeps = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RETRYABLE_ERRORS[0]("reset")
+            return "ok"
+
+        self.assertEqual(call_with_retry(flaky, sleep=sleeps.append), "ok")
+        self.assertEqual(len(attempts), 3)
+        # jittered exponential backoff: [d/2, d] for d = 0.2, 0.4
+        self.assertTrue(0.1 <= sleeps[0] <= 0.2)
+        self.assertTrue(0.2 <= sleeps[1] <= 0.4)
+
+    def test_gives_up_after_last_attempt(self):
+        def down():
+            raise RETRYABLE_ERRORS[0]("down")
+
+        with self.assertRaises(RETRYABLE_ERRORS[0]):
+            call_with_retry(down, attempts=2, sleep=lambda s: None)
+
+    def test_other_errors_are_not_retried(self):
+        calls = []
+
+        def bug():
+            calls.append(1)
+            raise KeyError("bug")
+
+        with self.assertRaises(KeyError):
+            call_with_retry(bug, sleep=lambda s: None)
+        self.assertEqual(len(calls), 1)
+
+    def test_retrying_llm_wraps_create(self):
+        replies = [RETRYABLE_ERRORS[0]("reset"), "fine"]
+        llm = FakeLLM(lambda kw: replies.pop(0))
+        wrapped = RetryingLLM(llm, base_delay=0.0)
+
+        completion = wrapped.chat.completions.create(model="m", messages=[])
+        self.assertEqual(completion.choices[0].message.content, "fine")
+        self.assertEqual(len(llm.calls), 2)
+
+
+class AgentFallbackPolicyTest(unittest.TestCase):
+    def test_api_error_falls_back_to_rules(self):
+        state = entities_agent(_state(), Tools(llm=FakeLLM(RETRYABLE_ERRORS[0]("down"))))
+        self.assertEqual(state.entities.get("product"), "credit card")
+        self.assertEqual(state.tool_calls, 1)
+        self.assertEqual(state.tool_successes, 0)
+
+    def test_malformed_json_falls_back_to_rules(self):
+        state = actions_agent(_state(), Tools(llm=FakeLLM("not json at all")))
+        self.assertTrue(state.recommended_actions)
+        self.assertEqual(state.tool_successes, 1)
+
+    def test_truncated_json_falls_back_to_rules(self):
+        llm = FakeLLM('{"product": "credit card", "other_tags": ["fee", "refund"], "iss')
+        state = entities_agent(_state(), Tools(llm=llm))
+        self.assertEqual(state.entities.get("product"), "credit card")
+        self.assertNotIn("raw_entities", state.entities)
+        self.assertEqual(state.llm_fallbacks, 1)
+
+    def test_non_numeric_scores_keep_defaults(self):
+        llm = FakeLLM('{"faithfulness_score": "high", "notes": "x"}')
+        state = evaluation_agent(_state(), Tools(llm=llm))
+        self.assertEqual(state.evaluation["faithfulness_score"], 1.0)
+
+    def test_stream_dropped_midway_falls_back_to_rules(self):
+        # what the HTTP transport raises when the connection drops mid-stream
+        dropped = (STREAM_ERRORS or RETRYABLE_ERRORS)[0]("peer closed connection")
+        llm = FakeLLM(lambda kw: stream(["The", " customer"], error=dropped))
+        tokens = []
+        tools = Tools(llm=llm, on_summary_token=tokens.append)
+
+        long_call = TRANSCRIPT * 3  # over the summarization length cutoff
+        state = summarization_agent(
+            CallState(raw_transcript=long_call, cleaned_transcript=long_call), tools
+        )
+        state = sentiment_agent(state, tools)
+
+        self.assertEqual(tokens, ["The", " customer"])
+        self.assertNotEqual(state.summary, "The customer")
+        self.assertTrue(state.sentiment)
+        self.assertEqual((state.tool_calls, state.tool_successes, state.llm_fallbacks), (2, 0, 2))
+
+    def test_programming_errors_propagate(self):
+        for error in (KeyError("k"), TypeError("t"), AttributeError("a"), IndexError("i")):
+            with self.subTest(error=type(error).__name__):
+                with self.assertRaises(type(error)):
+                    entities_agent(_state(), Tools(llm=FakeLLM(error)))
+
+
+if __name__ == "__main__":
+    unittest.main()
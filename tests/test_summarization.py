@@ -0,0 +1,51 @@
+# tests/test_summarization.py
+
+import re
+import unittest
+from unittest import mock
+
+from agents import summarization
+from agents.summarization import summarization_agent
+from graph.state import CallState
+from graph.tools import Tools
+from tests.fakes import FakeLLM
+
+
+def _reply(kwargs):
+    prompt = kwargs["messages"][-1]["content"]
+    if prompt.startswith("Below is part"):
+        return "Summary of part " + re.search(r"part (\d+) of", prompt).group(1) + "."
+    if prompt.startswith("Below are summaries"):
+        first, last = re.search(r"\((\d+) to (\d+) of", prompt).groups()
+        return f"Summary of parts {first} to {last}."
+    return "Final: " + " | ".join(re.findall(r"^Parts? \d[^:]*", prompt, re.M))
+
+
+class MapReduceSummaryTest(unittest.TestCase):
+    def setUp(self):
+        # a call too long for one request: 10 parts, combined 3 at a time
+        split = lambda text, max_tokens: [f"Customer line {i}." for i in range(10)]
+        for name, value in (("split_tokens", split), ("SUMMARIZE_MAX_PARTS", 3)):
+            patcher = mock.patch.object(summarization, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_every_part_reaches_the_final_summary(self):
+        transcript = "Customer: the refund for the double fee is still missing. " * 10
+        llm = FakeLLM(_reply)
+        state = summarization_agent(
+            CallState(cleaned_transcript=transcript), Tools(llm=llm, min_chars_for_llm=0)
+        )
+
+        prompts = [kw["messages"][-1]["content"] for kw in llm.calls]
+        parts = [p for p in prompts if p.startswith("Below is part")]
+        self.assertEqual(len(parts), 10)
+        # 10 → (1–3, 4–6, 7–9, 10) → (1–9, 10) → final
+        self.assertEqual(state.summary, "Final: Parts 1–9 | Part 10")
+        self.assertEqual(state.tool_calls, len(llm.calls))
+        self.assertEqual(state.tool_successes, state.tool_calls)
+        self.assertEqual(len(llm.calls), 10 + 3 + 1 + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
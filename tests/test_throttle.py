@@ -0,0 +1,86 @@
+# tests/test_throttle.py
+
+import threading
+import time
+import unittest
+
+from graph.throttle import ThrottledLLM, TokenBucket, estimate_request_tokens
+from tests.fakes import FakeLLM
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        # 60 per minute → one token per second
+        self.bucket = TokenBucket(60, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_full_bucket_does_not_wait(self):
+        self.assertEqual(self.bucket.acquire(60), 0.0)
+
+    def test_empty_bucket_waits_for_refill(self):
+        self.bucket.acquire(60)
+        self.assertAlmostEqual(self.bucket.acquire(3), 3.0)
+        self.assertAlmostEqual(self.clock.now, 3.0)
+
+    def test_refill_is_capped_at_capacity(self):
+        self.bucket.acquire(60)
+        self.clock.now += 3600
+        self.assertEqual(self.bucket.acquire(60), 0.0)
+        self.assertAlmostEqual(self.bucket.acquire(1), 1.0)
+
+    def test_oversized_request_still_goes_through(self):
+        self.assertEqual(self.bucket.acquire(500), 0.0)
+
+
+class ThrottledLLMTest(unittest.TestCase):
+    def test_estimate_counts_prompt_and_completion(self):
+        kwargs = {"messages": [{"content": "x" * 400}, {"content": None}], "max_tokens": 50}
+        self.assertEqual(estimate_request_tokens(kwargs), 150)
+
+    def test_concurrency_is_capped(self):
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def reply(kwargs):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            return "ok"
+
+        llm = ThrottledLLM(FakeLLM(reply), max_concurrency=2, rpm=None, tpm=None)
+        threads = [
+            threading.Thread(target=llm.chat.completions.create, kwargs={"messages": []})
+            for _ in range(6)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(peak), 6)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_other_attributes_are_forwarded(self):
+        inner = FakeLLM()
+        inner.embeddings = "embeddings endpoint"
+        self.assertEqual(ThrottledLLM(inner).embeddings, "embeddings endpoint")
+
+
+if __name__ == "__main__":
+    unittest.main()
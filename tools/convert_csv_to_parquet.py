@@ -0,0 +1,48 @@
+# tools/convert_csv_to_parquet.py
+
+"""
+One-off conversion of call CSVs to Parquet for faster app start-up.
+
+The Streamlit app prefers data/<name>.parquet over data/<name>.csv: Parquet
+is columnar and already typed, so it loads without re-parsing text.
+
+Usage:
+    python tools/convert_csv_to_parquet.py                  # every data/*.csv
+    python tools/convert_csv_to_parquet.py data/calls.csv   # specific files
+"""
+
+from __future__ import annotations
+from typing import List
+import pathlib
+import sys
+
+import pandas as pd
+
+
+DATA_DIR = pathlib.Path("data")
+
+
+def convert(csv_path: pathlib.Path) -> pathlib.Path:
+    """
+    Write <csv_path>.parquet (zstd-compressed) next to the CSV.
+    """
+    df = pd.read_csv(csv_path, engine="pyarrow", dtype_backend="pyarrow")
+    parquet_path = csv_path.with_suffix(".parquet")
+    df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+    return parquet_path
+
+
+def main(argv: List[str]) -> int:
+    paths = [pathlib.Path(a) for a in argv] or sorted(DATA_DIR.glob("*.csv"))
+    if not paths:
+        print(f"No CSV files found in {DATA_DIR}/")
+        return 1
+
+    for csv_path in paths:
+        parquet_path = convert(csv_path)
+        print(f"{csv_path} -> {parquet_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))